@@ -0,0 +1,127 @@
+"""
+Run the benchmark suite and write the results as JSON
+
+    python -m benchmarks [--sizes 1000,10000,100000] [--only records,cache] [-o results.json]
+    python -m benchmarks -o new.json --compare old.json
+
+With --compare, benchmarks more than --threshold slower per operation than in the earlier
+results are listed and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import Any
+
+from benchmarks import bench_cache
+from benchmarks import bench_history
+from benchmarks import bench_lookup
+from benchmarks import bench_records
+from benchmarks import bench_search
+from benchmarks import bench_stats
+from benchmarks import bench_unavailable
+from benchmarks.harness import Result
+
+SUITES = {
+    'records': bench_records,
+    'cache': bench_cache,
+    'search': bench_search,
+    'history': bench_history,
+    'unavailable': bench_unavailable,
+    'lookup': bench_lookup,
+    'stats': bench_stats,
+}
+
+DEFAULT_SIZES = '1000,10000,100000'
+DEFAULT_THRESHOLD = 0.2
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _key(result: dict[str, Any]) -> tuple[str, int | None]:
+    return result['name'], result['size']
+
+
+def regressions(old: dict[str, Any], new: dict[str, Any], threshold: float) -> list[str]:
+    before = {_key(result): result for result in old['results'] if not result['skipped']}
+    lines = []
+    for result in new['results']:
+        previous = before.get(_key(result))
+        if result['skipped'] or previous is None or not previous['per_op_us']:
+            continue
+        ratio = result['per_op_us'] / previous['per_op_us']
+        if ratio > 1 + threshold:
+            lines.append(
+                f'{result["name"]} (n={result["size"]}): '
+                f'{previous["per_op_us"]:.3f} -> {result["per_op_us"]:.3f} us/op ({ratio - 1:+.0%})'
+            )
+    return lines
+
+
+def _print(result: Result) -> None:
+    size = '' if result.size is None else f'n={result.size}'
+    if result.skipped:
+        print(f'{result.name:>34} {size:<9} skipped: {result.skipped}', file=sys.stderr)
+    else:
+        print(f'{result.name:>34} {size:<9} {result.per_op_us:12.3f} us/op', file=sys.stderr)
+
+
+def _write(path: str, report: dict[str, Any]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(report, indent=2) + '\n')
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='data set sizes, comma separated')
+    parser.add_argument('--only', help=f'comma separated subset of: {", ".join(SUITES)}')
+    parser.add_argument('-o', '--output', help='JSON file to write (default: stdout)')
+    parser.add_argument('--compare', help='earlier JSON results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed slowdown, e.g. 0.2')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.only.split(',') if args.only else list(SUITES)
+    unknown = set(names) - SUITES.keys()
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results: list[dict[str, Any]] = []
+    report = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'sizes': sizes,
+        'results': results,
+    }
+    for name in names:
+        for result in SUITES[name].run(sizes):
+            _print(result)
+            results.append(result.as_dict())
+        # rewritten after every suite, so a run that dies part way still leaves what it measured
+        if args.output:
+            _write(args.output, report)
+    if not args.output:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            slower = regressions(json.load(f), report, args.threshold)
+        for line in slower:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
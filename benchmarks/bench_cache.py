@@ -0,0 +1,91 @@
+"""
+LookupCache: opening, writing (directly and through a StoreWriter), reading, history paging and the
+legacy JsonStore import
+"""
+import json
+import os
+import random
+import tempfile
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_records
+from callsigns_kivy.cache import LookupCache
+from callsigns_kivy.writer import StoreWriter
+
+# reads and history pages timed per run, independent of the cache size
+READS = 1000
+PAGE_SIZE = 50
+
+
+def _fresh(directory: str, name: str) -> LookupCache:
+    path = os.path.join(directory, name)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return LookupCache(path, max_entries=None, max_bytes=None)
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            entries = [(record['call_sign'], [record]) for record in sample_records(size)]
+            # the big sizes are slow enough that a single run is already stable
+            repeat = 3 if size <= 10_000 else 1
+
+            def put_all(cache: LookupCache) -> None:
+                for call_sign, data in entries:
+                    cache.put(call_sign, data)
+                cache.close()
+
+            yield measure(
+                'cache.put', put_all, ops=size, size=size, repeat=repeat, setup=lambda: _fresh(directory, 'put.db')
+            )
+
+            def put_all_behind(cache: LookupCache) -> None:
+                writer = StoreWriter(cache)
+                for call_sign, data in entries:
+                    writer.put(call_sign, data)
+                writer.close()
+                cache.close()
+
+            yield measure(
+                'cache.put_write_behind',
+                put_all_behind,
+                ops=size,
+                size=size,
+                repeat=repeat,
+                setup=lambda: _fresh(directory, 'put.db'),
+            )
+
+            path = os.path.join(directory, f'full-{size}.db')
+            full = LookupCache(path, max_entries=None, max_bytes=None)
+            for call_sign, data in entries:
+                full.put(call_sign, data)
+            full.close()
+            yield measure('cache.open', lambda _: LookupCache(path).close(), ops=1, size=size)
+
+            cache = LookupCache(path, max_entries=None, max_bytes=None)
+            keys = random.Random(0).choices([call_sign for call_sign, _ in entries], k=READS)
+            yield measure('cache.get', lambda _: list(map(cache.get, keys)), ops=READS, size=size)
+            yield measure('cache.first_page', lambda _: cache.page(None, PAGE_SIZE), ops=1, size=size)
+            cache.close()
+
+            legacy = os.path.join(directory, f'legacy-{size}.json')
+            with open(legacy, 'w', encoding='utf-8') as f:
+                json.dump({call_sign: {'data': data, 'expires': None} for call_sign, data in entries}, f)
+
+            def import_legacy(cache: LookupCache) -> None:
+                cache.import_json_store(legacy)
+                cache.close()
+
+            yield measure(
+                'cache.import_json_store',
+                import_legacy,
+                ops=size,
+                size=size,
+                repeat=repeat,
+                setup=lambda: _fresh(directory, 'import.db'),
+            )
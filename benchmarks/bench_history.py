@@ -0,0 +1,104 @@
+"""
+Populating the lookup history list the way the app does after startup, in a headless Kivy
+
+Kivy exits the whole process when it finds no usable window provider (no display or GL, as on
+most CI machines), so the suite runs in a child process and a child that dies is recorded as a
+skip rather than taking the other suites with it.
+
+    python -m benchmarks.bench_history [--sizes 1000,10000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_records
+from benchmarks.harness import skipped
+from callsigns_kivy.cache import LookupCache
+
+
+NAMES = ('history.first_page', 'history.all_pages')
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _headless_env() -> dict[str, str]:
+    # no window or console log; the list's data can be populated without ever drawing it
+    return {
+        'KIVY_NO_ARGS': '1',
+        'KIVY_NO_CONSOLELOG': '1',
+        'KIVY_NO_FILELOG': '1',
+        'SDL_VIDEODRIVER': 'dummy',
+        **os.environ,
+    }
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    child = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_history', '--sizes', ','.join(map(str, sizes))],
+        capture_output=True,
+        text=True,
+        cwd=_ROOT,
+        env=_headless_env(),
+    )
+    # one result per line, so whatever finished before a crash is kept
+    results = [Result(**json.loads(line)) for line in child.stdout.splitlines() if line.startswith('{')]
+    yield from results
+    if child.returncode:
+        lines = child.stderr.strip().splitlines()
+        reason = f'exited with status {child.returncode}' + (f': {lines[-1]}' if lines else '')
+        done = {(result.name, result.size) for result in results}
+        for size in sizes:
+            for name in NAMES:
+                if (name, size) not in done:
+                    yield skipped(name, reason, size)
+
+
+def _run(sizes: Sequence[int]) -> Iterator[Result]:
+    try:
+        from callsigns_kivy.app import Callsigns
+        from callsigns_kivy.app import HistoryList
+    except ImportError as e:
+        for size in sizes:
+            for name in NAMES:
+                yield skipped(name, f'kivy unavailable: {e}', size)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f'history-{size}.db')
+            store = LookupCache(path, max_entries=None, max_bytes=None)
+            for record in sample_records(size):
+                store.put(record['call_sign'], [record])
+
+            def history() -> HistoryList:
+                # pages are read where the app would hand them to a worker, to time the work itself
+                history_list = HistoryList(Callsigns._history_item, lambda done, fn, *args: done(fn(*args)))
+                history_list.store = store
+                return history_list
+
+            def all_pages(history_list: HistoryList) -> None:
+                while not history_list._exhausted:
+                    history_list.load_next_page()
+
+            yield measure('history.first_page', HistoryList.load_next_page, ops=1, size=size, setup=history)
+            yield measure('history.all_pages', all_pages, ops=size, size=size, setup=history, repeat=1)
+            store.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000', help='data set sizes, comma separated')
+    args = parser.parse_args(argv)
+    for result in _run([int(size) for size in args.sizes.split(',')]):
+        print(json.dumps(result._asdict()), flush=True)
+
+
+if __name__ == '__main__':
+    main()
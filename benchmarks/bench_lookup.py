@@ -0,0 +1,67 @@
+"""
+End-to-end lookups through the core lookup chain against a local stub of the endpoint
+"""
+import functools
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_records
+from callsigns_kivy.api import fetch_lookup
+from callsigns_kivy.cache import LookupCache
+from callsigns_kivy.core import lookup
+from callsigns_kivy.httpclient import HTTPClient
+from callsigns_kivy.stubserver import StubServer
+
+# lookups per timed run; network round trips dominate, so this does not scale with --sizes
+LOOKUPS = 200
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    records = sample_records(LOOKUPS, seed=1)
+    call_signs = [record['call_sign'] for record in records]
+    stub = StubServer({record['call_sign']: [record] for record in records})
+    with stub as server, tempfile.TemporaryDirectory() as directory:
+        pooled = HTTPClient()
+        fetch = functools.partial(fetch_lookup, client=pooled, base_url=server.base_url)
+
+        def fresh_store() -> LookupCache:
+            path = os.path.join(directory, f'{time.monotonic_ns()}.db')
+            return LookupCache(path, max_entries=None, max_bytes=None)
+
+        def lookup_all(store: LookupCache, fetch=fetch) -> None:
+            for call_sign in call_signs:
+                lookup(call_sign, store, fetch=fetch)
+
+        def new_connection_each(call_sign: str, validators=None):
+            client = HTTPClient()
+            try:
+                return fetch_lookup(call_sign, validators, client=client, base_url=server.base_url)
+            finally:
+                client.close()
+
+        yield measure(
+            'lookup.network_new_connections',
+            lambda store: lookup_all(store, new_connection_each),
+            ops=LOOKUPS,
+            setup=fresh_store,
+        )
+        yield measure('lookup.network_keep_alive', lookup_all, ops=LOOKUPS, setup=fresh_store)
+
+        def expired_store() -> LookupCache:
+            store = fresh_store()
+            lookup_all(store)
+            for call_sign in call_signs:
+                store.touch(call_sign, 0.0)
+            return store
+
+        yield measure('lookup.revalidate_304', lookup_all, ops=LOOKUPS, setup=expired_store)
+
+        warm = fresh_store()
+        lookup_all(warm)
+        yield measure('lookup.cache_hit', lambda _: lookup_all(warm), ops=LOOKUPS)
+        pooled.close()
@@ -0,0 +1,50 @@
+"""
+LicenseRecord conversion and the memoized synthetic properties
+"""
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_records
+from callsigns_kivy import records
+from callsigns_kivy.records import LicenseRecord
+
+_MEMOIZED = (
+    records._call_sign_morse,
+    records._morse_counts,
+    records._call_sign_format,
+    records._phonetic,
+    records._syllable_length,
+)
+
+
+def _clear_memos() -> list[LicenseRecord]:
+    for memo in _MEMOIZED:
+        memo.cache_clear()
+    return []
+
+
+def _synthetic(items: Sequence[LicenseRecord]) -> None:
+    for record in items:
+        record.call_sign_morse, record.morse_dits, record.format, record.phonetic, record.syllable_length
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    for size in sizes:
+        dicts = sample_records(size)
+        items = [LicenseRecord.from_dict(d) for d in dicts]
+        yield measure('records.from_dict', lambda _: list(map(LicenseRecord.from_dict, dicts)), ops=size, size=size)
+        yield measure('records.as_dict', lambda _: [r.as_dict() for r in items], ops=size, size=size)
+        yield measure(
+            'records.as_dict_compact', lambda _: [r.as_dict(compact=True) for r in items], ops=size, size=size
+        )
+        yield measure(
+            'records.as_dict_synthetic',
+            lambda _: [r.as_dict(include_synthetic=True) for r in items],
+            ops=size,
+            size=size,
+        )
+        # cold: every call sign computed once; warm: served from the memo
+        yield measure('records.synthetic_cold', lambda _: _synthetic(items), ops=size, size=size, setup=_clear_memos)
+        yield measure('records.synthetic_warm', lambda _: _synthetic(items), ops=size, size=size)
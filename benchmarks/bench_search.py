@@ -0,0 +1,53 @@
+"""
+CallSignIndex: prefix and wildcard queries, building the typo index and typo searches
+"""
+import random
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_call_signs
+from callsigns_kivy.fuzzy import ALPHABET
+from callsigns_kivy.fuzzy import FuzzyIndex
+from callsigns_kivy.search import CallSignIndex
+
+# queries timed per run, independent of the index size
+QUERIES = 200
+
+
+def _typos(call_signs: list[str], n: int, edits: int, seed: int = 0) -> list[str]:
+    # known call signs with ``edits`` characters copied wrong
+    rng = random.Random(seed)
+    typos = []
+    for call_sign in rng.choices(call_signs, k=n):
+        chars = list(call_sign)
+        for i in rng.sample(range(len(chars)), min(edits, len(chars))):
+            chars[i] = rng.choice(ALPHABET)
+        typos.append(''.join(chars))
+    return typos
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    for size in sizes:
+        call_signs = sample_call_signs(size)
+        index = CallSignIndex(call_signs)
+        index.prepare()
+        prefixes = [call_sign[:3] for call_sign in random.Random(0).choices(call_signs, k=QUERIES)]
+        wildcards = ['?' + call_sign[1:] for call_sign in random.Random(1).choices(call_signs, k=QUERIES)]
+        one_typo = _typos(call_signs, QUERIES, 1)
+        two_typos = _typos(call_signs, QUERIES, 2)
+        # the big sizes are slow enough that a single run is already stable
+        repeat = 3 if size <= 100_000 else 1
+
+        yield measure('search.prefix', lambda _: list(map(index.search, prefixes)), ops=QUERIES, size=size)
+        yield measure('search.wildcard', lambda _: list(map(index.search, wildcards)), ops=QUERIES, size=size)
+        yield measure(
+            'search.similar_build',
+            lambda _: FuzzyIndex(call_signs),
+            ops=size,
+            size=size,
+            repeat=repeat,
+        )
+        yield measure('search.similar_1', lambda _: list(map(index.similar, one_typo)), ops=QUERIES, size=size)
+        yield measure('search.similar_2', lambda _: list(map(index.similar, two_typos)), ops=QUERIES, size=size)
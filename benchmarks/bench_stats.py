@@ -0,0 +1,68 @@
+"""
+LicenseStats: building the columns from a license database, reloading them and breakdowns
+"""
+import collections
+import datetime
+import os
+import random
+import tempfile
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import measure
+from benchmarks.harness import Result
+from benchmarks.harness import sample_records
+from callsigns_kivy.records import LicenseRecord
+from callsigns_kivy.stats import LicenseStats
+from callsigns_kivy.uls import LicenseDatabase
+
+TODAY = datetime.date(2026, 1, 1)
+
+
+def _records(size: int) -> list[dict]:
+    # expiry dates spread over two years either side of TODAY, so some are always coming up
+    rng = random.Random(0)
+    records = sample_records(size)
+    for system_identifier, record in enumerate(records, 1):
+        record['system_identifier'] = str(system_identifier)
+        record['expired_date'] = (TODAY + datetime.timedelta(rng.randrange(-730, 730))).strftime('%m/%d/%Y')
+        record['vanity'] = rng.choice('YN')
+    return records
+
+
+def _class_by_state_loop(records: list[dict]) -> collections.Counter:
+    # the same breakdown as LicenseStats.class_by_state, a record at a time
+    counts: collections.Counter = collections.Counter()
+    for record in map(LicenseRecord.from_dict, records):
+        if record.status == 'A':
+            counts[record.state or '', record.operator_class or ''] += 1
+    return counts
+
+
+def run(sizes: Sequence[int]) -> Iterator[Result]:
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            records = _records(size)
+            db = LicenseDatabase(os.path.join(directory, f'licenses-{size}.db'))
+            fields = LicenseRecord._fields
+            db._conn.executemany(
+                f'INSERT INTO licenses ({", ".join(fields)}) VALUES ({", ".join("?" * len(fields))})',
+                [tuple(map(record.get, fields)) for record in records],
+            )
+            db._conn.commit()
+            # the big sizes are slow enough that a single run is already stable
+            repeat = 3 if size <= 100_000 else 1
+
+            yield measure(
+                'stats.build', lambda _: LicenseStats.from_connection(db._conn), ops=size, size=size, repeat=repeat
+            )
+            stats = db.stats()
+            yield measure('stats.load', lambda _: LicenseStats.load(db._conn), ops=1, size=size)
+            yield measure('stats.class_by_state', lambda _: stats.class_by_state(), ops=1, size=size)
+            yield measure(
+                'stats.class_by_state_records', lambda _: _class_by_state_loop(records), ops=1, size=size, repeat=repeat
+            )
+            yield measure(
+                'stats.expiring_by_district', lambda _: stats.expiring_by_district(90, TODAY), ops=1, size=size
+            )
+            db.close()
@@ -0,0 +1,85 @@
+"""
+Throughput of the UNAVAILABLE_PATTERNS check over the full 2x3 call sign space
+
+    python -m benchmarks.bench_unavailable [--stride N]
+
+The per-call-sign strategies are timed on every Nth call sign and extrapolated; the block
+masks are timed over the whole space.
+"""
+import argparse
+import itertools
+import re
+import string
+import time
+from collections.abc import Iterator
+from collections.abc import Sequence
+
+from benchmarks.harness import Result
+from callsigns_kivy.records import UNAVAILABLE_PATTERNS
+from callsigns_kivy.unavailable import UnavailableMatcher
+from callsigns_kivy.vanity import PREFIXES
+
+SUFFIXES = [''.join(p) for p in itertools.product(string.ascii_uppercase, repeat=3)]
+STEMS = [f'{prefix}{district}' for prefix in PREFIXES if len(prefix) == 2 for district in range(10)]
+SPACE = len(STEMS) * len(SUFFIXES)
+
+DEFAULT_STRIDE = 50
+
+
+def sample(stride: int) -> list[str]:
+    return [stem + suffix for stem in STEMS for suffix in SUFFIXES[::stride]]
+
+
+def bench_pattern_by_pattern(call_signs: list[str]) -> tuple[float, int]:
+    patterns = [re.compile(pattern) for pattern in UNAVAILABLE_PATTERNS]
+    start = time.perf_counter()
+    hits = sum(1 for call_sign in call_signs if any(pattern.search(call_sign) for pattern in patterns))
+    return time.perf_counter() - start, hits
+
+
+def bench_combined(call_signs: list[str]) -> tuple[float, int]:
+    matcher = UnavailableMatcher()
+    start = time.perf_counter()
+    hits = sum(map(matcher, call_signs))
+    return time.perf_counter() - start, hits
+
+
+def bench_block_masks() -> tuple[float, int]:
+    matcher = UnavailableMatcher()
+    start = time.perf_counter()
+    allowed = sum(sum(matcher.allowed_mask(stem, 3)) for stem in STEMS)
+    return time.perf_counter() - start, SPACE - allowed
+
+
+def run(sizes: Sequence[int] = (), stride: int = DEFAULT_STRIDE) -> Iterator[Result]:
+    # for the suite; the space is fixed, so ``sizes`` does not apply
+    call_signs = sample(stride)
+    yield Result('unavailable.pattern_by_pattern', None, len(call_signs), bench_pattern_by_pattern(call_signs)[0])
+    yield Result('unavailable.combined', None, len(call_signs), bench_combined(call_signs)[0])
+    yield Result('unavailable.block_masks', None, SPACE, bench_block_masks()[0])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--stride', type=int, default=DEFAULT_STRIDE, help='time the per-call-sign strategies on every Nth suffix'
+    )
+    args = parser.parse_args(argv)
+
+    call_signs = sample(args.stride)
+    print(f'2x3 space: {SPACE:,} call signs; per-call-sign sample: {len(call_signs):,}')
+    results = [
+        ('pattern-by-pattern', *bench_pattern_by_pattern(call_signs), len(call_signs)),
+        ('combined alternation', *bench_combined(call_signs), len(call_signs)),
+        ('block masks', *bench_block_masks(), SPACE),
+    ]
+    for name, elapsed, hits, checked in results:
+        rate = checked / elapsed
+        print(
+            f'{name:>22}: {rate:>14,.0f} call signs/s  '
+            f'full space {SPACE / rate:8.2f}s  unavailable {hits / checked:6.1%}'
+        )
+
+
+if __name__ == '__main__':
+    main()
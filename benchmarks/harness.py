@@ -0,0 +1,84 @@
+import random
+import string
+import time
+import typing
+from collections.abc import Callable
+
+DEFAULT_REPEAT = 5
+
+
+class Result(typing.NamedTuple):
+    name: str
+    size: int | None  # entries in the data set, where the benchmark scales with one
+    ops: int  # operations per timed run
+    seconds: float  # fastest of the timed runs
+    skipped: str | None = None
+
+    @property
+    def per_op_us(self) -> float:
+        return self.seconds / self.ops * 1e6 if self.ops else 0.0
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        return {**self._asdict(), 'per_op_us': self.per_op_us}
+
+
+def measure(
+    name: str,
+    run: Callable[[typing.Any], object],
+    *,
+    ops: int,
+    size: int | None = None,
+    setup: Callable[[], typing.Any] | None = None,
+    repeat: int = DEFAULT_REPEAT,
+) -> Result:
+    """
+    Best of ``repeat`` runs of ``run(setup())``; only ``run`` is timed
+
+    The minimum is the least noisy estimate of what the code itself costs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return Result(name, size, ops, best)
+
+
+def skipped(name: str, reason: str, size: int | None = None) -> Result:
+    return Result(name, size, 0, 0.0, reason)
+
+
+def sample_call_signs(n: int, seed: int = 0) -> list[str]:
+    # unique, plausible US amateur call signs in the common formats
+    rng = random.Random(seed)
+    letters = string.ascii_uppercase
+    call_signs: dict[str, None] = {}
+    while len(call_signs) < n:
+        prefix = ''.join(rng.choice(letters) for _ in range(rng.choice((1, 2))))
+        suffix = ''.join(rng.choice(letters) for _ in range(rng.choice((1, 2, 3))))
+        call_signs[f'{prefix}{rng.randrange(10)}{suffix}'] = None
+    return list(call_signs)
+
+
+def sample_records(n: int, seed: int = 0) -> list[dict[str, typing.Any]]:
+    # compact license dicts, as the lookup endpoint returns and the cache stores them
+    rng = random.Random(seed)
+    return [
+        {
+            'call_sign': call_sign,
+            'status': rng.choice('AAAAECT'),
+            'frn': f'{rng.randrange(10**10):010d}',
+            'system_identifier': str(rng.randrange(10**7)),
+            'first_name': rng.choice(('John', 'Mary', 'Hiram', 'Ada', 'Grace')),
+            'last_name': rng.choice(('Smith', 'Maxim', 'Lovelace', 'Hopper', 'Nguyen')),
+            'street_address': f'{rng.randrange(1, 9999)} Main St',
+            'city': 'Springfield',
+            'state': rng.choice(('CT', 'WA', 'TX', 'CA')),
+            'zip_code': f'{rng.randrange(100000):05d}',
+            'grant_date': '04/01/2023',
+            'expired_date': '04/01/2033',
+            'operator_class': rng.choice('TGE'),
+        }
+        for call_sign in sample_call_signs(n, seed)
+    ]
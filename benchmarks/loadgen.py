@@ -0,0 +1,158 @@
+"""
+Load generator for the lookup layer
+
+    python -m benchmarks.loadgen --stub 1000 --latency 0.03 --concurrency 16 --requests 5000
+    python -m benchmarks.loadgen --base-url http://127.0.0.1:8080 --call-signs fixtures.json --mode lookup
+
+Drives fetch_lookup (--mode fetch) or the whole core lookup chain with a throwaway cache
+(--mode lookup) from --concurrency threads sharing one keep-alive client, and reports
+throughput and latency percentiles. --stub N serves N generated call signs from an
+in-process stand-in server instead of --base-url.
+"""
+import argparse
+import collections
+import contextlib
+import functools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+from callsigns_kivy.api import fetch_lookup
+from callsigns_kivy.batch import read_call_signs
+from callsigns_kivy.cache import LookupCache
+from callsigns_kivy.core import lookup
+from callsigns_kivy.httpclient import HTTPClient
+from callsigns_kivy.metrics import Histogram
+from callsigns_kivy.stubserver import generate_fixtures
+from callsigns_kivy.stubserver import load_fixtures
+from callsigns_kivy.stubserver import StubServer
+
+MODES = ('fetch', 'lookup')
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 2000
+
+
+def _call_signs(path: str) -> list[str]:
+    # a stand-in server fixtures file, or any log the batch lookup reads
+    if path.endswith('.json'):
+        return list(load_fixtures(path))
+    return read_call_signs(path)
+
+
+def run_load(
+    operation: Callable[[str], str], call_signs: list[str], *, concurrency: int, requests: int, seed: int = 0
+) -> dict[str, Any]:
+    """
+    Run ``operation(call_sign) -> outcome`` ``requests`` times from ``concurrency`` threads
+    """
+    order = random.Random(seed).choices(call_signs, k=requests)
+    work = iter(order)
+    work_lock = threading.Lock()
+    histogram = Histogram()
+    outcomes: collections.Counter[str] = collections.Counter()
+    results_lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with work_lock:
+                call_sign = next(work, None)
+            if call_sign is None:
+                return
+            start = time.perf_counter()
+            try:
+                outcome = operation(call_sign)
+            except Exception as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with results_lock:
+                histogram.record(elapsed)
+                outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'latency': histogram.summary(),
+        'outcomes': dict(outcomes),
+    }
+
+
+@contextlib.contextmanager
+def _target(args: argparse.Namespace) -> Iterator[tuple[str, list[str]]]:
+    if args.stub:
+        fixtures = generate_fixtures(args.stub)
+        stub = StubServer(
+            fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, expires=args.expires
+        )
+        with stub as server:
+            yield server.base_url, list(fixtures)
+    else:
+        yield args.base_url, _call_signs(args.call_signs)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--base-url', help='lookup API to load; needs --call-signs')
+    target.add_argument('--stub', type=int, metavar='N', help='start a stand-in server with N call signs')
+    parser.add_argument('--call-signs', help='fixtures JSON or a call sign list / log')
+    parser.add_argument('--mode', choices=MODES, default='fetch')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument('--max-idle', type=int, help='idle connections kept per host (default: --concurrency)')
+    parser.add_argument('--latency', type=float, default=0.0, help='with --stub: seconds added per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='with --stub: up to this many more seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='with --stub: fraction answered with a 503')
+    parser.add_argument('--expires', type=float, help='with --stub: Expires this many seconds ahead')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+    if args.base_url and not args.call_signs:
+        parser.error('--base-url needs --call-signs')
+
+    client = HTTPClient(max_idle_per_host=args.max_idle or args.concurrency)
+    with _target(args) as (base_url, call_signs), tempfile.TemporaryDirectory() as directory:
+        fetch = functools.partial(fetch_lookup, client=client, base_url=base_url)
+        if args.mode == 'fetch':
+
+            def operation(call_sign: str) -> str:
+                return fetch(call_sign).status
+
+        else:
+            store = LookupCache(os.path.join(directory, 'load.db'), max_entries=None, max_bytes=None)
+
+            def operation(call_sign: str) -> str:
+                return lookup(call_sign, store, fetch=fetch).source
+
+        report = run_load(operation, call_signs, concurrency=args.concurrency, requests=args.requests)
+    client.close()
+    report.update(mode=args.mode, base_url=base_url, connections_opened=client.connections_opened)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    latency = report['latency']
+    print(f'{report["requests"]:,} {args.mode} requests at concurrency {args.concurrency} in {report["seconds"]:.2f}s')
+    print(f'throughput: {report["throughput"]:,.0f}/s  connections opened: {report["connections_opened"]}')
+    print(
+        f'latency ms: p50 {latency["p50_ms"]:.1f}  p95 {latency["p95_ms"]:.1f}  '
+        f'p99 {latency["p99_ms"]:.1f}  max {latency["max_ms"]:.1f}'
+    )
+    print('outcomes: ' + ', '.join(f'{name} {count:,}' for name, count in sorted(report['outcomes'].items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import sys
+
+from . import batch
+from .cache import CACHE_DB_FILE
+from .cache import LookupCache
+from .core import describe_records
+from .core import fcc_fallback
+from .core import format_address
+from .core import lookup
+from .records import LICENSE_STATUS_CODES
+from .stats import DEFAULT_EXPIRY_DAYS
+from .stats import report
+from .uls import LICENSE_DB_FILE
+from .uls import LicenseDatabase
+from .uls import REVERSE_INDEXES
+
+# Headless entry point, e.g. python -m callsigns_kivy lookup K7ABC. Only the Kivy-free core is
+# imported here, so it runs without a display from scripts and cron jobs.
+
+
+def _lookup(args: argparse.Namespace) -> int:
+    store = LookupCache.open(args.cache)
+    db = LicenseDatabase.open_if_exists(args.db)
+    missing = 0
+    for call_sign in args.call_signs:
+        result = lookup(call_sign, store, db, offline=args.offline)
+        if result.records is None and args.fcc and not args.offline:
+            _, result = fcc_fallback(call_sign, store)
+        missing += result.records is None
+        if args.json:
+            print(json.dumps(result._asdict()))
+        elif result.records is None:
+            print(f'{result.call_sign}: not found')
+        else:
+            print('\n'.join(text for text in describe_records(result.records, db).values() if text), end='\n\n')
+    # non-zero when any call sign was not found, for scripts
+    return 1 if missing else 0
+
+
+def _find(args: argparse.Namespace) -> int:
+    db = LicenseDatabase.open_if_exists(args.db)
+    if db is None:
+        print(f'{args.db}: no local license database; build one with python -m callsigns_kivy.uls', file=sys.stderr)
+        return 2
+    found = 0
+    # streamed a page at a time, so the first results show up straight away
+    for page in db.iter_find(args.key, args.value):
+        for record in page:
+            found += 1
+            if args.json:
+                print(json.dumps(record.as_dict(compact=True)))
+                continue
+            status = LICENSE_STATUS_CODES.get(record.status, record.status)
+            address = format_address(record.as_dict()).replace('\n', ', ')
+            print(f'{record.call_sign:<8} {status:<10} {address}')
+    return 0 if found else 1
+
+
+def _stats(args: argparse.Namespace) -> int:
+    db = LicenseDatabase.open_if_exists(args.db)
+    if db is None:
+        print(f'{args.db}: no local license database; build one with python -m callsigns_kivy.uls', file=sys.stderr)
+        return 2
+    stats = db.stats()
+    if not args.json:
+        print(report(stats, args.days))
+        return 0
+    summary = {
+        'licenses': len(stats),
+        'active': stats.where(status='A').count(1),
+        'class_by_state': [
+            {'state': state, 'operator_class': operator_class, 'count': count}
+            for (state, operator_class), count in stats.class_by_state().items()
+        ],
+        'expiring_by_district': stats.expiring_by_district(args.days),
+    }
+    print(json.dumps(summary))
+    return 0
+
+
+def _batch(args: argparse.Namespace) -> int:
+    batch.run(args)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m callsigns_kivy', description='Call sign lookups without the GUI')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = subparsers.add_parser('lookup', help='look up one or more call signs')
+    lookup_parser.add_argument('call_signs', nargs='+', metavar='CALL_SIGN')
+    lookup_parser.add_argument('--json', action='store_true', help='one JSON object per call sign')
+    lookup_parser.add_argument('--offline', action='store_true', help='only the cache and the local database')
+    lookup_parser.add_argument(
+        '--fcc', action='store_true', help='ask the FCC License View API about call signs not found otherwise'
+    )
+    lookup_parser.add_argument('--cache', default=CACHE_DB_FILE)
+    lookup_parser.add_argument('--db', default=LICENSE_DB_FILE)
+    lookup_parser.set_defaults(handler=_lookup)
+
+    find_parser = subparsers.add_parser('find', help='licenses by FRN, last name, ZIP code, trustee or previous call')
+    find_parser.add_argument('key', choices=REVERSE_INDEXES)
+    find_parser.add_argument('value')
+    find_parser.add_argument('--json', action='store_true', help='one JSON object per license')
+    find_parser.add_argument('--db', default=LICENSE_DB_FILE)
+    find_parser.set_defaults(handler=_find)
+
+    stats_parser = subparsers.add_parser('stats', help='license counts by state, operator class and call district')
+    stats_parser.add_argument(
+        '--days', type=int, default=DEFAULT_EXPIRY_DAYS, help='how far ahead to count expiring licenses'
+    )
+    stats_parser.add_argument('--json', action='store_true')
+    stats_parser.add_argument('--db', default=LICENSE_DB_FILE)
+    stats_parser.set_defaults(handler=_stats)
+
+    batch_parser = subparsers.add_parser('batch', help=batch.BATCH_DESCRIPTION.lower())
+    batch.add_arguments(batch_parser)
+    batch_parser.set_defaults(handler=_batch)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
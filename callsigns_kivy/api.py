@@ -0,0 +1,198 @@
+import http.client
+import json
+import os
+import typing
+import urllib.parse
+from typing import Any
+
+from .httpclient import default_client
+from .httpclient import HTTPClient
+from .metrics import metrics
+from .records import LICENSE_STATUS_CODES
+from .records import LicenseRecord
+
+LOOKUP_BASE_URL = 'https://callsigns.spyoung.com'
+LOOKUP_PATH = '/callsigns/{call_sign}.json'
+FCC_BASE_URL = 'https://data.fcc.gov'
+FCC_LICENSE_VIEW_PATH = '/api/license-view/basicSearch/getLicenses'
+
+# point either API somewhere else, e.g. at a local python -m callsigns_kivy.stubserver
+LOOKUP_BASE_URL_ENV = 'CALLSIGNS_LOOKUP_BASE_URL'
+FCC_BASE_URL_ENV = 'CALLSIGNS_FCC_BASE_URL'
+
+# License View results are paged; the search matches substrings, so short call signs can
+# match many licenses, and only this many pages are read
+FCC_ROWS_PER_PAGE = 100
+FCC_MAX_PAGES = 10
+
+LOOKUP_OK = 'ok'
+LOOKUP_NOT_MODIFIED = 'not_modified'
+LOOKUP_NOT_FOUND = 'not_found'
+LOOKUP_ERROR = 'error'
+
+_LICENSE_STATUS_BY_DESC = {desc: code for code, desc in LICENSE_STATUS_CODES.items()}
+
+
+class Validators(typing.NamedTuple):
+    # from a previous response, for conditional revalidation
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class LookupResponse(typing.NamedTuple):
+    status: str
+    data: list[dict[str, Any]] | None = None
+    expires: str | None = None
+    validators: Validators = Validators()
+
+
+def lookup_url(call_sign: str, base_url: str | None = None) -> str:
+    base_url = base_url or os.environ.get(LOOKUP_BASE_URL_ENV) or LOOKUP_BASE_URL
+    return base_url.rstrip('/') + LOOKUP_PATH.format(call_sign=urllib.parse.quote(call_sign))
+
+
+def fcc_license_view_url(base_url: str | None = None) -> str:
+    base_url = base_url or os.environ.get(FCC_BASE_URL_ENV) or FCC_BASE_URL
+    return base_url.rstrip('/') + FCC_LICENSE_VIEW_PATH
+
+
+def decode_lookup(body: bytes | str | list) -> list[dict[str, Any]]:
+    # the endpoint returns every license the call sign has had, oldest first
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    if isinstance(body, str):
+        body = json.loads(body)
+    # anything else (a JSON object, a null entry) is a malformed response, reported as ValueError
+    if not isinstance(body, list) or not all(isinstance(lic_data, dict) for lic_data in body):
+        raise ValueError('Lookup response is not a list of licenses')
+    return [LicenseRecord.from_dict(lic_data).as_dict(compact=True) for lic_data in body]
+
+
+def fetch_lookup(
+    call_sign: str,
+    validators: Validators | None = None,
+    *,
+    client: HTTPClient | None = None,
+    base_url: str | None = None,
+) -> LookupResponse:
+    """
+    Blocking lookup against the call sign endpoint, for use off the UI thread
+
+    With ``validators`` from an earlier response the request is conditional, and an unchanged
+    entry comes back as LOOKUP_NOT_MODIFIED (with a fresh Expires) instead of a new body.
+    """
+    client = client or default_client()
+    headers = {}
+    if validators is not None:
+        if validators.etag:
+            headers['If-None-Match'] = validators.etag
+        if validators.last_modified:
+            headers['If-Modified-Since'] = validators.last_modified
+    try:
+        resp = client.request(lookup_url(call_sign, base_url), headers)
+    except (OSError, http.client.HTTPException):
+        return LookupResponse(LOOKUP_ERROR)
+    response_validators = Validators(resp.headers.get('etag'), resp.headers.get('last-modified'))
+    if resp.status == 304:
+        # validators sent with a 304 replace the stored ones (RFC 9111 4.3.4); absent ones are kept
+        validators = validators or Validators()
+        response_validators = Validators(
+            response_validators.etag or validators.etag, response_validators.last_modified or validators.last_modified
+        )
+        return LookupResponse(LOOKUP_NOT_MODIFIED, None, resp.headers.get('expires'), response_validators)
+    if resp.status == 404:
+        return LookupResponse(LOOKUP_NOT_FOUND)
+    if not resp.ok:
+        return LookupResponse(LOOKUP_ERROR)
+    try:
+        with metrics.span('decode', bytes=len(resp.body)):
+            data = decode_lookup(resp.body)
+    except ValueError:
+        return LookupResponse(LOOKUP_ERROR)
+    return LookupResponse(LOOKUP_OK, data, resp.headers.get('expires'), response_validators)
+
+
+def fetch_fcc_licenses(
+    call_sign: str,
+    *,
+    page: int = 1,
+    rows_per_page: int = FCC_ROWS_PER_PAGE,
+    client: HTTPClient | None = None,
+    base_url: str | None = None,
+) -> dict[str, Any] | None:
+    # one page of the raw License View API response, or None if the request failed
+    client = client or default_client()
+    query = urllib.parse.urlencode(
+        {'searchValue': call_sign, 'format': 'json', 'pageNum': page, 'rowsPerPage': rows_per_page}
+    )
+    try:
+        resp = client.request(f'{fcc_license_view_url(base_url)}?{query}')
+    except (OSError, http.client.HTTPException):
+        return None
+    if not resp.ok:
+        return None
+    try:
+        return json.loads(resp.body)
+    except ValueError:
+        return None
+
+
+def license_view_record(entry: dict[str, str]) -> LicenseRecord:
+    """
+    Normalize a License View API license into a LicenseRecord
+
+    The API only describes a license briefly; fields it does not carry are left as None.
+    """
+    last_name, _, given = (entry.get('licName') or '').partition(', ')
+    first_name, _, middle_initial = given.partition(' ')
+    status = entry.get('statusDesc') or None
+    fields = {
+        'call_sign': entry['callsign'].upper(),
+        'status': _LICENSE_STATUS_BY_DESC.get(status, status),
+        'frn': entry.get('frn') or None,
+        'system_identifier': entry.get('licenseID') or None,
+        'first_name': first_name or None,
+        'middle_initial': middle_initial or None,
+        # entities (clubs, trustees' stations) have a single name with no comma
+        'last_name': last_name or None,
+        'expired_date': entry.get('expiredDate') or None,
+    }
+    return LicenseRecord.from_dict(fields)
+
+
+def find_fcc_licenses(
+    call_sign: str,
+    *,
+    rows_per_page: int = FCC_ROWS_PER_PAGE,
+    max_pages: int = FCC_MAX_PAGES,
+    client: HTTPClient | None = None,
+    base_url: str | None = None,
+) -> LookupResponse:
+    """
+    The licenses the FCC License View API has for exactly ``call_sign``
+
+    The API matches call signs by substring, so results are streamed page by page (up to
+    ``max_pages``) and only exact matches are kept, as compact LicenseRecord dicts.
+    """
+    call_sign = call_sign.upper()
+    matches = []
+    for page in range(1, max_pages + 1):
+        with metrics.span('fcc.page', page=page):
+            data = fetch_fcc_licenses(
+                call_sign, page=page, rows_per_page=rows_per_page, client=client, base_url=base_url
+            )
+        if data is None:
+            return LookupResponse(LOOKUP_ERROR)
+        if 'Errors' in data:
+            # 'No license data was found' comes back as an error rather than an empty page
+            break
+        licenses = data.get('Licenses') or {}
+        entries = licenses.get('License') or []
+        for entry in entries:
+            if entry.get('callsign', '').upper() == call_sign:
+                matches.append(license_view_record(entry).as_dict(compact=True))
+        if not entries or page * rows_per_page >= int(licenses.get('totalRows') or 0):
+            break
+    if not matches:
+        return LookupResponse(LOOKUP_NOT_FOUND)
+    return LookupResponse(LOOKUP_OK, matches)
@@ -1,487 +1,276 @@
-import json
+import concurrent.futures
 import pathlib
-import re
 import string
-import typing
+import threading
+import time
 import webbrowser
+from collections.abc import Callable
 from functools import partial
 from typing import Any
-from typing import Self
 
 import kivymd.icon_definitions  # noqa
+from kivy.clock import Clock
 from kivy.config import Config
-from kivy.network.urlrequest import UrlRequest
-from kivy.storage.jsonstore import JsonStore
+from kivy.lang import Builder
+from kivy.logger import Logger
+from kivy.metrics import dp
+from kivy.properties import NumericProperty
+from kivy.properties import ObjectProperty
+from kivy.properties import StringProperty
+from kivy.uix.scrollview import ScrollView
 from kivymd.app import MDApp
 from kivymd.uix.button import MDFlatButton
 from kivymd.uix.button import MDRectangleFlatButton
 from kivymd.uix.dialog import MDDialog
+from kivymd.uix.filemanager import MDFileManager
 from kivymd.uix.gridlayout import MDGridLayout
 from kivymd.uix.label import MDLabel
-from kivymd.uix.list import MDList
 from kivymd.uix.list import OneLineListItem
-from kivymd.uix.scrollview import MDScrollView
+from kivymd.uix.recycleview import MDRecycleView
 from kivymd.uix.textfield import MDTextField
 
+from .api import LOOKUP_ERROR
+from .api import LOOKUP_OK
+from .batch import default_output_path
+from .batch import read_call_signs
+from .batch import run_batch
+from .batch import write_results
+from .cache import CacheEntry
+from .cache import LookupCache
+from .core import describe_records
+from .core import fcc_fallback
+from .core import format_name
+from .core import lookup_local
+from .core import lookup_remote
+from .core import lookup_view
+from .core import LookupResult
+from .core import LookupView
+from .core import Page
+from .core import parse_reverse_query
+from .core import reverse_page
+from .core import REVERSE_QUERY_SEPARATOR
+from .core import SOURCE_MISSING
+from .dispatch import LookupDispatcher
+from .metrics import metrics
+from .profiling import startup
+from .records import LICENSE_STATUS_CODES
+from .records import LicenseRecord
+from .search import CallSignIndex
+from .search import WILDCARDS
+from .stats import report
+from .uls import LICENSE_DB_FILE
+from .uls import LicenseDatabase
+from .writer import StoreWriter
+
 this_file = pathlib.Path(__file__)
 icon_file = str(this_file.parent / 'callsigns-logo.png')
 
 
 Config.window_icon = icon_file
 
-
-# TODO: support additional alphabets
-PHONETIC_WORDS = {
-    'A': 'Alpha',
-    'B': 'Bravo',
-    'C': 'Charlie',
-    'D': 'Delta',
-    'E': 'Echo',
-    'F': 'Foxtrot',
-    'G': 'Golf',
-    'H': 'Hotel',
-    'I': 'India',
-    'J': 'Juliet',
-    'K': 'Kilo',
-    'L': 'Lima',
-    'M': 'Mike',
-    'N': 'November',
-    'O': 'Oscar',
-    'P': 'Papa',
-    'Q': 'Quebec',
-    'R': 'Romeo',
-    'S': 'Sierra',
-    'T': 'Tango',
-    'U': 'Uniform',
-    'V': 'Victor',
-    'W': 'Whiskey',
-    'X': 'Xray',
-    'Y': 'Yankee',
-    'Z': 'Zulu',
-    '0': 'Zero',
-    '1': 'One',
-    '2': 'Two',
-    '3': 'Three',
-    '4': 'Four',
-    '5': 'Five',
-    '6': 'Six',
-    '7': 'Seven',
-    '8': 'Eight',
-    '9': 'Niner',
-}
-
-SYLLABLE_LENGTHS = {
-    'A': 2,
-    'B': 2,
-    'C': 2,
-    'D': 2,
-    'E': 2,
-    'F': 2,
-    'G': 1,
-    'H': 2,
-    'I': 3,
-    'J': 3,
-    'K': 2,
-    'L': 2,
-    'M': 1,
-    'N': 3,
-    'O': 2,
-    'P': 2,
-    'Q': 2,
-    'R': 3,
-    'S': 3,
-    'T': 2,
-    'U': 3,
-    'V': 2,
-    'W': 2,
-    'X': 2,
-    'Y': 2,
-    'Z': 2,
-    '0': 2,
-    '1': 1,
-    '2': 1,
-    '3': 1,
-    '4': 1,
-    '5': 1,
-    '6': 1,
-    '7': 2,
-    '8': 1,
-    '9': 2,  # 'Niner' is 2 but 'nine' (one syllable) could also be used
-}
-
-MORSE_TABLE = {
-    'A': '.-',
-    'B': '-...',
-    'C': '-.-.',
-    'D': '-..',
-    'E': '.',
-    'F': '..-.',
-    'G': '--.',
-    'H': '....',
-    'I': '..',
-    'J': '.---',
-    'K': '-.-',
-    'L': '.-..',
-    'M': '--',
-    'N': '-.',
-    'O': '---',
-    'P': '.--.',
-    'Q': '--.-',
-    'R': '.-.',
-    'S': '...',
-    'T': '-',
-    'U': '..-',
-    'V': '...-',
-    'W': '.--',
-    'X': '-..-',
-    'Y': '-.--',
-    'Z': '--..',
-    '0': '-----',
-    '1': '.----',
-    '2': '..---',
-    '3': '...--',
-    '4': '....-',
-    '5': '.....',
-    '6': '-....',
-    '7': '--...',
-    '8': '---..',
-    '9': '----.',
-}
-
-
-# REF: https://www.fcc.gov/sites/default/files/public_access_database_definitions_v9_0.pdf
-
-# Amateur fields
-FCC_AM_FIELD_NAMES = [
-    'Record Type [AM]',
-    'Unique System Identifier',
-    'ULS File Number',
-    'EBF Number',
-    'Call Sign',
-    'Operator Class',
-    'Group Code',
-    'Region Code',
-    'Trustee Call Sign',
-    'Trustee Indicator',
-    'Physician Certification',
-    'VE Signature',
-    'Systematic Call Sign Change',
-    'Vanity Call Sign Change',
-    'Vanity Relationship',
-    'Previous Call Sign',
-    'Previous Operator Class',
-    'Trustee Name',
-]
-
-# License Header fields
-FCC_HD_FIELD_NAMES = [
-    'Record Type',
-    'Unique System Identifier',
-    'ULS File Number',
-    'EBF Number',
-    'Call Sign',
-    'License Status',
-    'Radio Service Code',
-    'Grant Date',
-    'Expired Date',
-    'Cancellation Date',
-    'Eligibility Rule Num',
-    'Reserved',
-    'Alien',
-    'Alien Government',
-    'Alien Corporation',
-    'Alien Officer',
-    'Alien Control',
-    'Revoked',
-    'Convicted',
-    'Adjudged',
-    'Reserved',
-    'Common Carrier',
-    'Non Common Carrier',
-    'Private Comm',
-    'Fixed',
-    'Mobile',
-    'Radiolocation',
-    'Satellite',
-    'Developmental or STA or Demonstration',
-    'Interconnected Service',
-    'Certifier First Name',
-    'Certifier MI',
-    'Certifier Last Name',
-    'Certifier Suffix',
-    'Certifier Title',
-    'Female',
-    'Black or African-American',
-    'Native American',
-    'Hawaiian',
-    'Asian',
-    'White',
-    'Hispanic',
-    'Effective Date',
-    'Last Action Date',
-    'Data File Format',
-    'of 89 HD',
-    'Auction ID integer',
-    'Broadcast Services - Regulatory Status',
-    'Band Manager - Regulatory Status',
-    'Broadcast Services - Type of Radio Service',
-    'Alien Ruling',
-    'Licensee Name Change',
-    'Whitespace Indicator',
-    'Operation/Performance Requirement Choice',
-    'Operation/Performance Requirement Answer',
-    'Discontinuation of Service',
-    'Regulatory Compliance',
-    '900 MHz Eligibility Certification',
-    '900 MHz Transition Plan Certification',
-    '900 MHz Return Spectrum Certification',
-    '900 MHz Payment Certification',
-]
-
-# Entity fields
-FCC_EN_FIELD_NAMES = [
-    'Record Type [EN]',
-    'Unique System Identifier',
-    'ULS File Number',
-    'EBF Number',
-    'Call Sign',
-    'Entity Type',
-    'Licensee ID',
-    'Entity Name',
-    'First Name',
-    'MI',
-    'Last Name',
-    'Suffix',
-    'Phone',
-    'Fax',
-    'Email',
-    'Street Address',
-    'City',
-    'State',
-    'Zip Code',
-    'PO Box',
-    'Attention Line',
-    'SGIN',
-    'FCC Registration Number (FRN)',
-    'Applicant Type Code',
-    'Applicant Type Code Other',
-    'Status Code',
-    'Status Date',
-    '3.7 GHz License Type',
-    'Linked Unique System Identifier',
-    'Linked Call Sign',
-]
-
-# REF: https://www.fcc.gov/wireless/data/public-access-files-database-downloads
-#      File: ULS Code Definitions, currently https://www.fcc.gov/sites/default/files/uls_code_definitions_20240215.txt
-
-LICENSE_STATUS_CODES = {
-    'A': 'Active',
-    'C': 'Canceled',
-    'E': 'Expired',
-    'L': 'Pending Legal Status',
-    'P': 'Parent Station Canceled',
-    'T': 'Terminated',
-    'X': 'Term Pending',
-}
-
-OPERATOR_CLASS_CODES = {
-    'A': 'Advanced',
-    'E': 'Amateur Extra',
-    'G': 'General',
-    'N': 'Novice',
-    'P': 'Technician Plus',
-    'T': 'Technician',
-}
-
-UNAVAILABLE_PATTERNS = [
-    # REF: "Call Sign Choices Not Available" http://www.arrl.org/vanity-call-signs
-    # 1.KA2AA-KA9ZZ, KC4AAA-KC4AAF, KC4USA-KC4USZ, KG4AA-KG4ZZ, KC6AA-KC6ZZ, KL9KAA- KL9KHZ, KX6AA-KX6ZZ;
-    r'^KA[2-9][A-Z][A-Z]$',
-    r'^KC4AA[A-F]$',
-    r'^KC4US[A-Z]$',
-    r'^KG4[A-Z][A-Z]$',
-    r'^KC6[A-Z][A-Z]$',
-    r'^KL9K[A-H][A-Z]$',
-    r'^KX6[A-Z][A-Z]$',
-    # 2. Any call sign having the letters SOS or QRA-QUZ as the suffix;
-    r'[A-Z]{1,2}\d(?>SOS|Q[R-U][A-Z])$',
-    # 3. Any call sign having the letters AM-AZ as the prefix
-    r'^A[M-Z]\d[A-Z]+$',
-    # 4. Any 2-by-3 format call sign having the letter X as the first letter of the suffix;
-    r'^[A-Z]{2}\dX[A-Z]{2}$',
-    # 5. Any 2-by-3 format call sign having the letters AF, KF, NF, or WF as the prefix and the letters EMA as the suffix
-    r'^[AKNW]F\dEMA$',
-    # 6. Any 2-by-3 format call sign having the letters AA-AL as the prefix
-    r'^A[A-L]\d[A-Z]{3}$',
-    # 7. Any 2-by-3 format call sign having the letters NA-NZ as the prefix;
-    r'^N[A-Z]\d[A-Z]{3}$',
-    # 8. Any 2-by-3 format call sign having the letters WC, WK, WM, WR, or WT as the prefix (Group X call signs);
-    r'^W[CKMRT]\d[A-Z]{3}$',
-    # 9.  Any 2-by-3 format call sign having the letters KP, NP or WP as the prefix and the numeral 0, 6, 7, 8 or 9;
-    # 10. Any 2-by-2 format call sign having the letters KP, NP or WP as the prefix and the numeral 0, 6, 7, 8 or 9;
-    # 11. Any 2-by-1 format call sign having the letters KP, NP or WP as the prefix and the numeral 0, 6, 7, 8 or 9;
-    r'^[KNW]P[06789][A-Z]{1,3}$',
-    # 12. Call signs having the single letter prefix (K, N or W), a single digit numeral 0-9 and a single letter suffix
-    r'^[KNW]\d[A-Z]$',
-]
-
-
-class LicenseRecord(typing.NamedTuple):
-    call_sign: str
-    status: str
-    frn: str | None
-    system_identifier: str
-    first_name: str | None
-    middle_initial: str | None
-    last_name: str | None
-    street_address: str | None
-    attn_line: str | None
-    city: str | None
-    state: str | None
-    zip_code: str | None
-    po_box: str | None
-    grant_date: str | None
-    expired_date: str | None
-    cancellation_date: str | None
-    operator_class: str | None
-    group_code: str | None
-    trustee_call_sign: str | None
-    trustee_name: str | None
-    previous_call_sign: str | None
-    region_code: str | None
-    vanity: str | None
-    systematic: str | None
-
-    @property
-    def call_sign_morse(self) -> str:
-        return ' '.join(MORSE_TABLE[c] for c in self.call_sign)
-
-    @property
-    def morse_dits(self) -> int:
-        return self.call_sign_morse.count('.')
-
-    @property
-    def morse_dahs(self) -> int:
-        return self.call_sign_morse.count('-')
-
-    @property
-    def format(self) -> str:
-        pattern = r'([A-Z]+)\d([A-Z]+)'
-        match = re.match(pattern, self.call_sign)
-        if not match:
-            return ''
-        prefix, suffix = match.groups()
-        return f'{len(prefix)}x{len(suffix)}'
-
-    @property
-    def phonetic(self) -> str:
-        return ' '.join(PHONETIC_WORDS[c] for c in self.call_sign)
-
-    @property
-    def syllable_length(self) -> int:
-        return self.get_syllable_length()
-
-    def get_syllable_length(self, lengths: dict[str, int] | None = None) -> int:
-        if lengths is None:
-            lengths = SYLLABLE_LENGTHS
-        return sum(lengths[c] for c in self.call_sign)
-
-    @property
-    def fcc_uls_link(self) -> str:
-        return f'https://wireless2.fcc.gov/UlsApp/UlsSearch/license.jsp?licKey={self.system_identifier}'
-
-    @property
-    def qrz_call_sign_link(self) -> str:
-        return f'https://www.qrz.com/db/{self.call_sign}'
-
-    def as_dict(self, include_synthetic: bool = False) -> dict[str, str | int | None]:
-        d: dict[str, str | int | None] = {
-            'call_sign': self.call_sign,
-            'status': self.status,
-            'frn': self.frn,
-            'system_identifier': self.system_identifier,
-            'first_name': self.first_name,
-            'middle_initial': self.middle_initial,
-            'last_name': self.last_name,
-            'street_address': self.street_address,
-            'attn_line': self.attn_line,
-            'city': self.city,
-            'state': self.state,
-            'zip_code': self.zip_code,
-            'po_box': self.po_box,
-            'grant_date': self.grant_date,
-            'expired_date': self.expired_date,
-            'cancellation_date': self.cancellation_date,
-            'operator_class': self.operator_class,
-            'group_code': self.group_code,
-            'trustee_call_sign': self.trustee_call_sign,
-            'trustee_name': self.trustee_name,
-            'previous_call_sign': self.previous_call_sign,
-            'region_code': self.region_code,
-            'vanity': self.vanity,
-            'systematic': self.systematic,
-        }
-        if include_synthetic:
-            d.update(
-                {
-                    'call_sign_morse': self.call_sign_morse,
-                    'morse_dits': self.morse_dits,
-                    'morse_dahs': self.morse_dahs,
-                    'format': self.format,
-                    'phonetic': self.phonetic,
-                    'syllable_length': self.syllable_length,
-                    'fcc_uls_link': self.fcc_uls_link,
-                    'qrz_call_sign_link': self.qrz_call_sign_link,
-                }
-            )
-        return d
-
-    @classmethod
-    def from_dict(cls, d: dict[str, Any]) -> Self:
-        return cls(
-            call_sign=d.get('call_sign'),  # type: ignore[arg-type]
-            status=d.get('status'),  # type: ignore[arg-type]
-            frn=d.get('frn'),
-            system_identifier=d.get('system_identifier'),  # type: ignore[arg-type]
-            first_name=d.get('first_name'),
-            middle_initial=d.get('middle_initial'),
-            last_name=d.get('last_name'),
-            street_address=d.get('street_address'),
-            attn_line=d.get('attn_line'),
-            city=d.get('city'),
-            state=d.get('state'),
-            zip_code=d.get('zip_code'),
-            po_box=d.get('po_box'),
-            grant_date=d.get('grant_date'),
-            expired_date=d.get('expired_date'),
-            cancellation_date=d.get('cancellation_date'),
-            operator_class=d.get('operator_class'),
-            group_code=d.get('group_code'),
-            trustee_call_sign=d.get('trustee_call_sign'),
-            trustee_name=d.get('trustee_name'),
-            previous_call_sign=d.get('previous_call_sign'),
-            region_code=d.get('region_code'),
-            vanity=d.get('vanity'),
-            systematic=d.get('systematic'),
-        )
+# simultaneous requests to the lookup endpoint
+MAX_CONCURRENT_LOOKUPS = 4
+
+# near matches offered when a call sign is not found
+SIMILAR_LIMIT = 5
+
+Builder.load_string(
+    '''
+<HistoryItem>:
+    text_color: app.theme_cls.primary_color
+
+<SuggestionItem>:
+    text_color: app.theme_cls.primary_color
+
+<SuggestionList>:
+    viewclass: 'SuggestionItem'
+    size_hint_y: None
+    height: 0
+    RecycleBoxLayout:
+        default_size: None, dp(40)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        orientation: 'vertical'
+
+<HistoryList>:
+    viewclass: 'HistoryItem'
+    RecycleBoxLayout:
+        default_size: None, dp(48)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        orientation: 'vertical'
+'''
+)
 
 
 class CallsignInput(MDTextField):
     def insert_text(self, substring, from_undo=False):
+        allowed = string.ascii_letters + string.digits + WILDCARDS + REVERSE_QUERY_SEPARATOR
+        if REVERSE_QUERY_SEPARATOR in self.text + substring:
+            # reverse lookup values can be names, e.g. name:O'Brien
+            allowed += " -'"
         for c in substring:
-            if c not in string.ascii_letters + string.digits:
+            if c not in allowed:
                 return
         super().insert_text(substring.upper(), from_undo=from_undo)
 
 
+class DiagnosticsTitle(MDLabel):
+    # the diagnostics panel is hidden behind a triple tap on the title
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos) and touch.is_triple_tap:
+            MDApp.get_running_app().show_diagnostics()
+            return True
+        return super().on_touch_down(touch)
+
+
+class SuggestionItem(OneLineListItem):
+    def on_release(self):
+        MDApp.get_running_app().select_suggestion(self.text)
+
+
+class SuggestionList(MDRecycleView):
+    max_visible = NumericProperty(5)
+    row_height = NumericProperty(40)
+
+    def show(self, call_signs: list[str]) -> None:
+        self.data = [{'text': call_sign} for call_sign in call_signs]
+        self.height = min(len(call_signs), self.max_visible) * self.row_height
+
+
+class HistoryItem(OneLineListItem):
+    call_sign = StringProperty()
+    records = ObjectProperty()
+
+    def on_release(self):
+        MDApp.get_running_app()._show_info(self.records)
+
+
+class HistoryList(MDRecycleView):
+    """
+    Lookup history, newest first, or the results of a reverse lookup
+
+    Only the rows in view have widgets; the backing entries are read from the store (or the
+    results' pager) a page at a time as the list is scrolled towards its end.
+    """
+
+    page_size = NumericProperty(50)
+    title = StringProperty('Lookup History')
+
+    def __init__(self, format_item, in_background, **kwargs):
+        super().__init__(**kwargs)
+        # attached once the store has been opened, after the first frame
+        self.store: LookupCache | None = None
+        self.format_item = format_item
+        # in_background(done, fn, *args): fn(*args) off the UI thread, then done(result) on it
+        self.in_background = in_background
+        self._results: Callable[[int | None, int], Page] | None = None
+        self._next_id: int | None = None
+        self._exhausted = False
+        self._loading = False
+        self._generation = 0
+
+    def load_next_page(self, *args, done: Callable[[Page], None] | None = None) -> None:
+        # the page is read (and its entries decoded) on a worker; done(page) once it is shown
+        if self._loading or self._exhausted or (self.store is None and self._results is None):
+            return
+        self._loading = True
+        pager = self._results or self.store.page
+        self.in_background(
+            partial(self._page_loaded, self._generation, done), pager, self._next_id, int(self.page_size)
+        )
+
+    def _page_loaded(self, generation: int, done: Callable[[Page], None] | None, page: Page | None) -> None:
+        if generation != self._generation:
+            # the list was restarted while this page was being read
+            return
+        self._loading = False
+        page = page or []
+        self.add_page(page)
+        if done is not None:
+            done(page)
+
+    def add_page(self, page: Page) -> None:
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if page:
+            self._next_id = page[-1][0]
+            self.data.extend(self.format_item(call_sign, records) for _, call_sign, records in page)
+
+    def _restart(
+        self, results: Callable[[int | None, int], Page] | None, done: Callable[[Page], None] | None = None
+    ) -> None:
+        self._results = results
+        self._next_id = None
+        self._exhausted = False
+        self._loading = False
+        self._generation += 1
+        self.data = []
+        self.scroll_y = 1
+        self.load_next_page(done=done)
+
+    def show_results(
+        self, title: str, pager: Callable[[int | None, int], Page], done: Callable[[Page], None] | None = None
+    ) -> None:
+        # pager(after, limit) -> the page after cursor ``after``; done(page) gets the first page
+        self.title = title
+        self._restart(pager, done)
+
+    def show_history(self) -> None:
+        if self._results is not None:
+            self.title = 'Lookup History'
+            self._restart(None)
+
+    def push(self, call_sign: str, records: list[dict[str, Any]]) -> None:
+        item = self.format_item(call_sign, records)
+        if self._results is not None and self.store is not None:
+            # back from a reverse lookup the history is read again, and its first page may already have this one
+            self.title = 'Lookup History'
+            self._restart(None, lambda page: self._put_first(item))
+            return
+        self.show_history()
+        self._put_first(item)
+
+    def _put_first(self, item: dict[str, Any]) -> None:
+        # a repeated lookup refreshes the top row rather than adding a second one
+        if self.data and self.data[0]['call_sign'] == item['call_sign']:
+            self.data[0] = item
+        else:
+            self.data.insert(0, item)
+
+    def on_scroll_y(self, instance, value) -> None:
+        # scroll_y reaches 0 at the bottom of the list
+        if value <= 0.1:
+            self.load_next_page()
+
+
 class Callsigns(MDApp):
+    # seconds of typing inactivity before suggestions are refreshed
+    suggestion_delay = 0.15
+    suggestion_limit = 10
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     def build(self):
+        with startup.phase('build'):
+            return self._build()
+
+    def _build(self):
         self.icon = icon_file
-        self.store = JsonStore('callsigns.json')
+        # opened on a worker thread after the first frame; see on_start
+        self.store: LookupCache | None = None
+        # every cache write from the app goes through this; see StoreWriter
+        self.writer: StoreWriter | None = None
+        self.license_db: LicenseDatabase | None = None
+        self._pending_lookup = False
+        # blocking requests over the shared keep-alive client; results are handed back on the Kivy clock
+        self.http_pool = concurrent.futures.ThreadPoolExecutor(MAX_CONCURRENT_LOOKUPS)
+        # local lookups, display text and history pages: quick, but kept off the UI thread and in order
+        self.view_pool = concurrent.futures.ThreadPoolExecutor(1)
+        self.dispatcher = LookupDispatcher(self._fetch_lookup, MAX_CONCURRENT_LOOKUPS)
         self.theme_cls.theme_style = 'Dark'
         self.container = MDGridLayout(cols=1, padding=[20, 40, 20, 20])
         self.window = MDGridLayout(cols=1, row_default_height=40)
@@ -489,8 +278,14 @@ class Callsigns(MDApp):
         self.dialog = None
         self.fail_dialog = None
         self.fcc_dialog = None
+        self.similar_dialog = None
+
+        self.diagnostics_dialog = None
+        self.stats_dialog = None
+        self.stats_label = None
+        self._stats_loading = False
 
-        title_label = MDLabel(
+        title_label = DiagnosticsTitle(
             text='Callsign Lookup',
             font_style='Caption',
             halign='center',
@@ -505,43 +300,160 @@ class Callsigns(MDApp):
         lookup_layout_right = MDGridLayout(cols=1)
         lookup_layout.add_widget(lookup_layout_left)
         lookup_layout.add_widget(lookup_layout_right)
-        self.history_list = MDList(id='history_list')
-        self.history_container = MDScrollView(self.history_list)
-        lookup_layout_right.add_widget(
-            MDLabel(
-                text='Lookup History',
-                font_style='Caption',
-                halign='center',
-                size_hint_y=None,
-                height=40,
-                text_color=self.theme_cls.primary_color,
-            )
+        self.history_list = HistoryList(self._history_item, partial(self._in_background, self.view_pool))
+        history_title = MDLabel(
+            text=self.history_list.title,
+            font_style='Caption',
+            halign='center',
+            size_hint_y=None,
+            height=40,
+            text_color=self.theme_cls.primary_color,
         )
+        self.history_list.bind(title=history_title.setter('text'))
+        lookup_layout_right.add_widget(history_title)
 
-        lookup_layout_right.add_widget(self.history_container)
+        lookup_layout_right.add_widget(self.history_list)
 
         self.callsign_input = CallsignInput(
             hint_text='Enter callsign', helper_text='e.g., KK7LHM', size_hint_x=None, width=100, halign='center'
         )
+        self.suggestions = SuggestionList()
+        self.call_sign_index: CallSignIndex | None = None
+        self._looked_up = None
+        self._suggest_trigger = Clock.create_trigger(self._update_suggestions, self.suggestion_delay)
+        self.callsign_input.bind(text=self._on_input_text)
 
         btn = MDRectangleFlatButton(
             text='Lookup',
             on_release=self.btnfunc,
         )
+        batch_btn = MDFlatButton(text='Batch Lookup', on_release=self._open_batch_file_manager)
+        stats_btn = MDFlatButton(text='Statistics', on_release=self.show_stats)
+        self.batch_status = MDLabel(text='', font_style='Caption', size_hint_y=None, height=20)
+        self.batch_file_manager = None
         self.window.add_widget(title_label)
         lookup_input_layout = MDGridLayout(cols=1)
         lookup_input_layout.add_widget(self.callsign_input)
+        lookup_input_layout.add_widget(self.suggestions)
         lookup_input_layout.add_widget(btn)
+        lookup_input_layout.add_widget(batch_btn)
+        lookup_input_layout.add_widget(stats_btn)
+        lookup_input_layout.add_widget(self.batch_status)
 
         lookup_layout_left.add_widget(lookup_input_layout)
         self.info_layout = MDGridLayout(cols=1)
+        self.info_labels = {
+            name: MDLabel()
+            for name in (
+                'call_sign',
+                'addr',
+                'status',
+                'frn',
+                'grant_date',
+                'expired_date',
+                'cancellation_date',
+                'operator_class',
+                'phonetic',
+                'lineage',
+            )
+        }
+        self._pending_info = None
+        # bumped for every info update, so only the latest selection's text is shown
+        self._info_request = 0
+        self._render_info_trigger = Clock.create_trigger(self._render_info)
 
         lookup_layout_left.add_widget(self.info_layout)
 
         self.window.add_widget(lookup_layout)
         return self.container
 
-    def _callsign_not_found_dialog(self):
+    def _load_call_sign_index(self):
+        # runs on a worker thread; sorting a full license database takes a moment
+        if self.license_db is not None:
+            index = CallSignIndex.from_database(self.license_db)
+        else:
+            index = CallSignIndex()
+        for call_sign in self.store.call_signs():
+            index.add(call_sign)
+        index.prepare()
+        self.call_sign_index = index
+
+    def _on_input_text(self, instance, text):
+        if text == self._looked_up:
+            return
+        # restart the delay on every keystroke so suggestions follow a pause in typing
+        self._suggest_trigger.cancel()
+        self._suggest_trigger()
+
+    def _update_suggestions(self, *args):
+        text = self.callsign_input.text.upper()
+        if not text or self.call_sign_index is None or REVERSE_QUERY_SEPARATOR in text:
+            self.suggestions.show([])
+            return
+        matches = self.call_sign_index.search(text, self.suggestion_limit)
+        if matches == [text]:
+            matches = []
+        self.suggestions.show(matches)
+
+    def select_suggestion(self, call_sign: str) -> None:
+        self._suggest_trigger.cancel()
+        self._looked_up = call_sign
+        self.callsign_input.text = call_sign
+        self.btnfunc(None)
+
+    def _open_batch_file_manager(self, inst):
+        if self.store is None:
+            return
+        if self.batch_file_manager is None:
+            self.batch_file_manager = MDFileManager(
+                exit_manager=lambda *args: self.batch_file_manager.close(),
+                select_path=self._start_batch,
+                ext=['.adi', '.adif', '.csv', '.txt'],
+            )
+        self.batch_file_manager.show(str(pathlib.Path.home()))
+
+    def _start_batch(self, path: str):
+        self.batch_file_manager.close()
+        try:
+            call_signs = read_call_signs(path)
+        except OSError:
+            self.batch_status.text = f'Could not read {path}'
+            return
+        self.batch_status.text = f'Batch: 0/{len(call_signs)}'
+        threading.Thread(target=self._run_batch, args=(path, call_signs), daemon=True).start()
+
+    def _run_batch(self, path: str, call_signs: list[str]):
+        # worker thread; UI updates are handed back to the main thread through the clock
+        def progress(done, total, call_sign, found):
+            Clock.schedule_once(lambda dt: setattr(self.batch_status, 'text', f'Batch: {done}/{total} {call_sign}'))
+
+        results = run_batch(call_signs, self.writer, db=self.license_db, progress=progress)
+        output = default_output_path(path)
+        write_results(results, output)
+        found = sum(1 for result in results if result.records)
+        message = f'Batch done: {found}/{len(results)} found, saved to {output}'
+        Clock.schedule_once(lambda dt: setattr(self.batch_status, 'text', message))
+
+    def _callsign_not_found_dialog(self, call_sign: str | None = None):
+        if call_sign and self.call_sign_index:
+            # the near-match search scans the index, so it runs off the UI thread like the lookup did
+            self._in_background(
+                self.view_pool,
+                partial(self._on_similar_call_signs, call_sign),
+                self.call_sign_index.similar,
+                call_sign,
+                SIMILAR_LIMIT,
+            )
+            return
+        self._not_found_dialog()
+
+    def _on_similar_call_signs(self, call_sign: str, matches) -> None:
+        if matches:
+            self._similar_call_signs_dialog(call_sign, [match.call_sign for match in matches])
+        else:
+            self._not_found_dialog()
+
+    def _not_found_dialog(self):
         if not self.dialog:
             self.dialog = MDDialog(
                 text='Callsign not found.\nIf this callsign was issued very recently (last day or so) use the FCC Lookup',
@@ -563,6 +475,33 @@ class Callsigns(MDApp):
 
         self.dialog.open()
 
+    def _similar_call_signs_dialog(self, call_sign: str, call_signs: list[str]):
+        # a near miss is usually a copying error; offer the known call signs a typo or two away
+        def select(similar, inst):
+            self._dismiss_dialog(inst)
+            self.select_suggestion(similar)
+
+        self.similar_dialog = MDDialog(
+            title=f'{call_sign} not found. Did you mean:',
+            type='simple',
+            items=[OneLineListItem(text=similar, on_release=partial(select, similar)) for similar in call_signs],
+            buttons=[
+                MDFlatButton(
+                    text='OK',
+                    theme_text_color='Custom',
+                    text_color=self.theme_cls.primary_color,
+                    on_release=self._dismiss_dialog,
+                ),
+                MDFlatButton(
+                    text='FCC LOOKUP',
+                    theme_text_color='Custom',
+                    text_color=self.theme_cls.primary_color,
+                    on_release=self._fcc_fallback_lookup,
+                ),
+            ],
+        )
+        self.similar_dialog.open()
+
     def _fcc_lookup_failure_dialog(self, call_sign=None, origin_dialog=None):
         def _dismiss(inst):
             self._dismiss_dialog(inst)
@@ -591,45 +530,23 @@ class Callsigns(MDApp):
             else:
                 raise Exception('No dialog found')
 
-    def _fcc_link_dialog(self, fccdata, origin_dialog=None):
-        # example fccdata:
-        # {'status': 'OK',
-        #  'Licenses': {'page': '1',
-        #               'rowPerPage': '100',
-        #               'totalRows': '1',
-        #               'lastUpdate': 'Apr 7, 2023',
-        #               'License': [{'licName': 'Last, First I',
-        #                            'frn': '0012345678',
-        #                            'callsign': 'AA0ZZZ',
-        #                            'categoryDesc': 'Personal Use',
-        #                            'serviceDesc': 'Amateur',
-        #                            'statusDesc': 'Active',
-        #                            'expiredDate': '01/01/2033',
-        #                            'licenseID': '1234567',
-        #                            'licDetailURL': 'http://wireless2.fcc.gov/UlsApp/UlsSearch/license.jsp?__newWindow=false&licKey=1234567'}]}}
-
+    def _fcc_link_dialog(self, record: LicenseRecord, origin_dialog=None):
         def _dismiss(inst):
             self._dismiss_dialog(inst)
             if origin_dialog is not None:
                 self._dismiss_dialog(origin_dialog)
 
-        # XXX: this first result may not be the correct call sign
-        # The FCC License View API can return other call signs than was given in the parameter
-        # esp. when the searched call sign is a substring of another call sign
-        data = fccdata['Licenses']['License'][0]
-
-        # TODO: validate result is for the requested call sign
-
+        status = LICENSE_STATUS_CODES.get(record.status, record.status)
         self.fcc_dialog = MDDialog(
-            text=f'Call sign {data["callsign"]} found!\n'
-            f'Name: {data["licName"]}\n'
-            f'Status: {data["statusDesc"]}\n\nSee FCC profile page for full details',
+            text=f'Call sign {record.call_sign} found!\n'
+            f'Name: {format_name(record.as_dict())}\n'
+            f'Status: {status}\n\nSee FCC profile page for full details',
             buttons=[
                 MDFlatButton(
                     text='Open FCC Profile',
                     theme_text_color='Custom',
                     text_color=self.theme_cls.primary_color,
-                    on_release=lambda x: webbrowser.open(data['licDetailURL']),
+                    on_release=lambda x: webbrowser.open(record.fcc_uls_link),
                 ),
                 MDFlatButton(
                     text='Done',
@@ -643,25 +560,34 @@ class Callsigns(MDApp):
 
     def _fcc_fallback_lookup(self, inst):
         call_sign = self.callsign_input.text.upper()
+        start = time.perf_counter()
 
-        def on_success(req, result):
-            data = result
-            if 'Errors' in data:
-                self._fcc_lookup_failure_dialog(call_sign, origin_dialog=inst)
-            # TODO: implement push onto history and inline display
-            self._fcc_link_dialog(data, origin_dialog=inst)
+        def fetch() -> tuple[str, LookupView]:
+            status, result = fcc_fallback(call_sign, self.writer)
+            return status, lookup_view(result, self.license_db)
 
-        def on_failure(req, result):
-            self._fcc_lookup_failure_dialog(call_sign, origin_dialog=inst)
+        def on_result(outcome: tuple[str, LookupView] | None):
+            status, view = outcome or (LOOKUP_ERROR, lookup_view(LookupResult(call_sign, None, SOURCE_MISSING)))
+            metrics.record('fcc.total', time.perf_counter() - start, status=status, source=view.result.source)
+            if status != LOOKUP_OK:
+                self._fcc_lookup_failure_dialog(call_sign, origin_dialog=inst)
+                return
+            self._lookup_success(view)
+            self._fcc_link_dialog(LicenseRecord.from_dict(view.result.records[-1]), origin_dialog=inst)
 
-        def on_error(req, error):
-            self._fcc_lookup_failure_dialog(call_sign, origin_dialog=inst)
+        self._in_background(self.http_pool, on_result, fetch)
 
-        def on_progress(req, current_size, total_size):
-            pass  # You can add progress handling if needed
+    def _in_background(self, pool: concurrent.futures.Executor, done: Callable[[Any], None], fn, *args) -> None:
+        # fn(*args) on ``pool``; done(result) on the main thread, with None if fn raised
+        def finish(future: concurrent.futures.Future) -> None:
+            try:
+                result = future.result()
+            except Exception:
+                Logger.exception('Callsigns: background task failed')
+                result = None
+            Clock.schedule_once(lambda dt: done(result))
 
-        url = f'https://data.fcc.gov/api/license-view/basicSearch/getLicenses?searchValue={call_sign}&format=json'
-        UrlRequest(url, on_success=on_success, on_failure=on_failure, on_error=on_error, on_progress=on_progress)
+        pool.submit(fn, *args).add_done_callback(finish)
 
     def _dismiss_dialog(self, inst):
         dialog = self._find_dialog_parent(inst)
@@ -671,133 +597,250 @@ class Callsigns(MDApp):
         t = self.callsign_input.text.upper()
         if not t:
             return
-        if self.store.exists(t):
-            data = self.store.get(t)['data']
-            self._lookup_success(t, data)
+        if self.store is None:
+            # typed before the store finished opening; looked up as soon as it has
+            self._pending_lookup = True
+            return
+        query = parse_reverse_query(t)
+        if query is not None:
+            self._reverse_lookup(*query)
+            return
+        if any(c in t for c in WILDCARDS):
+            matches = self.call_sign_index.search(t, 1) if self.call_sign_index is not None else []
+            if not matches:
+                return
+            t = matches[0]
+            self._looked_up = t
+            self.callsign_input.text = t
+        self._suggest_trigger.cancel()
+        self.suggestions.show([])
+        # a lookup for this call sign is already on its way; its result will be shown
+        if self.dispatcher.pending(t):
+            return
+        start = time.perf_counter()
+        self._in_background(self.view_pool, partial(self._on_local_result, t, start), self._resolve_local, t)
+
+    def _resolve_local(self, t: str) -> tuple[LookupView | None, CacheEntry | None]:
+        # worker thread: the cache and the local database, and the display text if either knows t
+        result, cached = lookup_local(t, self.writer, self.license_db)
+        return (lookup_view(result, self.license_db) if result is not None else None), cached
+
+    def _on_local_result(self, t: str, start: float, outcome: tuple[LookupView | None, CacheEntry | None] | None):
+        view, cached = outcome or (None, None)
+        if view is not None:
+            self._lookup_success(view)
+            metrics.record('lookup.total', time.perf_counter() - start, source=view.result.source)
             return
+        if not self.dispatcher.pending(t):
+            self.dispatcher.request(t, partial(self._on_lookup_result, t, start))
+
+    def _reverse_lookup(self, key: str, value: str) -> None:
+        self._suggest_trigger.cancel()
+        self.suggestions.show([])
+        if self.license_db is None:
+            MDDialog(
+                text='Searching by FRN, name, ZIP code, trustee or previous call sign needs the local license database',
+                buttons=[
+                    MDFlatButton(text='OK', text_color=self.theme_cls.primary_color, on_release=self._dismiss_dialog)
+                ],
+            ).open()
+            return
+        title = f'{key.upper()} {value}'
 
-        def on_success(req, result):
-            data = result
-            if isinstance(data, bytes):
-                data = json.loads(data.decode('utf-8'))
-            data = [LicenseRecord.from_dict(lic_data).as_dict(include_synthetic=True) for lic_data in data]
-            expires = req.resp_headers.get('expires')
-            self.store.put(t, data=data, expires=expires)
-            self._lookup_success(t, data)
+        def first_page(page: Page) -> None:
+            if page:
+                self._show_info(page[0][2])
+            else:
+                self.history_list.title = f'{title}: no licenses found'
 
-        def on_failure(req, result):
-            self._callsign_not_found_dialog()
+        self.history_list.show_results(title, partial(reverse_page, self.license_db, key, value), first_page)
 
-        def on_error(req, error):
-            self._callsign_not_found_dialog()
+    def _fetch_lookup(self, t: str, done) -> None:
+        # runs once per call sign however many lookups are waiting on it; done() receives a LookupView
+        def fetch() -> LookupView:
+            # offline, an expired entry is still better than nothing
+            return lookup_view(lookup_remote(t, self.writer, self.writer.get(t)), self.license_db)
 
-        def on_progress(req, current_size, total_size):
-            pass  # You can add progress handling if needed
+        def finish(view: LookupView | None) -> None:
+            done(view or lookup_view(LookupResult(t, None, SOURCE_MISSING)))
 
-        url = f'https://callsigns.spyoung.com/callsigns/{t}.json'
-        UrlRequest(url, on_success=on_success, on_failure=on_failure, on_error=on_error, on_progress=on_progress)
+        self._in_background(self.http_pool, finish, fetch)
 
-    def _push_lookup_history(self, callsign: str, data: list[dict[str, Any]]):
+    def _on_lookup_result(self, t: str, start: float, view: LookupView) -> None:
+        metrics.record('lookup.total', time.perf_counter() - start, source=view.result.source)
+        if view.result.records:
+            self._lookup_success(view)
+        else:
+            self._callsign_not_found_dialog(t)
+
+    @staticmethod
+    def _history_item(callsign: str, data: list[dict[str, Any]]) -> dict[str, Any]:
         if len(data) == 1:
             current = data[0]
         else:
             current = data[-1]
-        name = self._format_name(current)
-        self.history_list.add_widget(
-            OneLineListItem(
-                text=f'{callsign} ({name})',
-                on_release=partial(self._show_info, data),
-                text_color=self.theme_cls.primary_color,
-            ),
-            index=len(self.history_list.children),
-        )
+        name = format_name(current)
+        return {'text': f'{callsign} ({name})', 'call_sign': callsign, 'records': data}
 
-    def _format_name(self, record_data) -> str:
-        return ' '.join(
-            i for i in (record_data['first_name'], record_data['middle_initial'], record_data['last_name']) if i
-        )
+    def _push_lookup_history(self, callsign: str, data: list[dict[str, Any]]):
+        self.history_list.push(callsign, data)
 
-    def _format_addr(self, record_data: dict[str, Any]) -> str:
-        name = self._format_name(record_data)
-        addr_info = '\n'.join(
-            i
-            for i in [
-                name,
-                record_data['street_address'],
-                record_data['attn_line'],
-                f"PO Box {record_data['po_box']}" if record_data['po_box'] else '',
-                ', '.join(
-                    [
-                        record_data['city'],
-                        ' '.join(
-                            (
-                                record_data['state'],
-                                record_data['zip_code'],
-                            )
-                        ),
-                    ]
-                ),
-            ]
-            if i
+    def _lookup_success(self, view: LookupView) -> None:
+        callsign = view.result.call_sign
+        if self.call_sign_index is not None:
+            self.call_sign_index.add(callsign)
+        self._push_lookup_history(callsign, view.result.records)
+        self._info_request += 1
+        self._set_info(view.info)
+
+    def _show_info(self, data: list[dict[str, Any]], inst=None):
+        # the text (and lineage) is worked out on a worker; a newer selection supersedes this one
+        self._info_request += 1
+        request = self._info_request
+        self._in_background(
+            self.view_pool, partial(self._on_info_ready, request), describe_records, data, self.license_db
         )
-        return addr_info
 
-    def _lookup_success(self, callsign: str, data: list[dict[str, Any]]) -> None:
-        self._push_lookup_history(callsign, data)
-        self._show_info(data)
+    def _on_info_ready(self, request: int, texts: dict[str, str] | None) -> None:
+        if request == self._info_request and texts is not None:
+            self._set_info(texts)
 
-    def _show_info(self, data: list[dict[str, Any]], inst=None):
-        if len(data) == 1:
-            current = data[0]
-        else:
-            current = data[-1]
-        addr_info = self._format_addr(current)
-
-        self.info_layout.clear_widgets()
-
-        self.info_call_sign = MDLabel()
-        self.info_addr = MDLabel()
-        self.info_status = MDLabel()
-        self.info_frn = MDLabel()
-        self.info_grant_date = MDLabel()
-        self.info_expired_date = MDLabel()
-        self.info_cancellation_date = MDLabel()
-        self.info_operator_class = MDLabel()
-        self.info_phonetic = MDLabel()
-        self.info_vanity = MDLabel()
-
-        statuses = {'A': 'Active', 'C': 'Cancelled', 'E': 'Expired', 'T': 'Terminated'}
-
-        status = statuses.get(current['status'], current['status'])
-
-        self.info_addr.text = addr_info
-        self.info_status.text = f'Status: {status}' if status else ''
-        self.info_grant_date.text = f"Grant Date: {current['grant_date']}"
-        self.info_expired_date.text = f"Expiration: {current['expired_date']}"
-        self.info_cancellation_date.text = f"Cancellation Date: {current['cancellation_date']}"
-        self.info_phonetic.text = f"phonetic: {current['phonetic']}"
-        self.info_call_sign.text = current['call_sign'] + (' (vanity)' if current['vanity'] else '')
-        self.info_frn.text = f"FRN: {current['frn']}" if current['frn'] else ''
-        self.info_operator_class.text = f"Operator Class: {current['operator_class']}"
-
-        for w in [
-            self.info_call_sign,
-            self.info_addr,
-            self.info_status,
-            self.info_frn,
-            self.info_grant_date,
-            self.info_expired_date,
-            self.info_cancellation_date,
-            self.info_operator_class,
-            self.info_phonetic,
-        ]:
-            if w.text:
-                self.info_layout.add_widget(w)
+    def _set_info(self, texts: dict[str, str]) -> None:
+        # coalesce rapid selections into one update per frame
+        self._pending_info = texts
+        self._render_info_trigger()
+
+    def _render_info(self, *args):
+        texts = self._pending_info
+        if texts is None:
+            return
+        self._pending_info = None
+        with metrics.span('ui.render_info'):
+            # labels are reused; only those whose text changed get a new texture and layout
+            for name, text in texts.items():
+                label = self.info_labels[name]
+                if label.text != text:
+                    label.text = text
+
+            visible = [self.info_labels[name] for name, text in texts.items() if text]
+            if visible != list(reversed(self.info_layout.children)):
+                self.info_layout.clear_widgets()
+                for label in visible:
+                    self.info_layout.add_widget(label)
 
     def on_start(self):
-        for call_sign, info in self.store._data.items():
-            data = info['data']
-            self._push_lookup_history(call_sign, data)
+        # callbacks scheduled here run before the first frame is drawn; hop one more frame
+        # so the window is up before the store is opened and any history is read
+        Clock.schedule_once(lambda dt: Clock.schedule_once(self._after_first_paint))
+
+    def _after_first_paint(self, *args):
+        startup.mark('first paint')
+        threading.Thread(target=self._open_stores, daemon=True).start()
+
+    def _open_stores(self):
+        # worker thread: the first open may import a legacy JSON store
+        with startup.phase('store load'):
+            store = LookupCache.open()
+            license_db = LicenseDatabase.open_if_exists(LICENSE_DB_FILE)
+            # read and decoded here too, so the main thread only has rows to add
+            history = store.page(None, int(self.history_list.page_size))
+        writer = StoreWriter(store)
+        Clock.schedule_once(lambda dt: self._on_stores_open(store, writer, license_db, history))
+
+    def _on_stores_open(
+        self, store: LookupCache, writer: StoreWriter, license_db: LicenseDatabase | None, history: Page
+    ):
+        self.store = store
+        self.writer = writer
+        self.license_db = license_db
+        self.history_list.store = store
+        with startup.phase('history render'):
+            self.history_list.add_page(history)
+        Logger.info('Callsigns: startup profile\n%s', startup.report())
+        for phase in startup.phases:
+            metrics.record(f'startup.{phase.name}', phase.duration)
+        threading.Thread(target=self._load_call_sign_index, daemon=True).start()
+        if self._pending_lookup:
+            self._pending_lookup = False
+            self.btnfunc(None)
+
+    def on_stop(self):
+        # commit the cache writes still queued before the process goes
+        if self.writer is not None:
+            self.writer.close()
+
+    def show_stats(self, inst=None):
+        if self.license_db is None:
+            MDDialog(
+                text='Statistics need the local license database',
+                buttons=[
+                    MDFlatButton(text='OK', text_color=self.theme_cls.primary_color, on_release=self._dismiss_dialog)
+                ],
+            ).open()
+            return
+        if self.stats_dialog is None:
+            # a monospaced label, so the tables line up; wider than the dialog, so it scrolls both ways
+            self.stats_label = MDLabel(text='Loading...', size_hint=(None, None))
+            # set after construction: MDLabel.__init__ applies its font_style, which would reset them
+            self.stats_label.font_name = 'RobotoMono-Regular'
+            self.stats_label.font_size = '12sp'
+            self.stats_label.bind(texture_size=self.stats_label.setter('size'))
+            scroll = ScrollView(size_hint_y=None, height=dp(400))
+            scroll.add_widget(self.stats_label)
+            self.stats_dialog = MDDialog(
+                title='Statistics',
+                type='custom',
+                content_cls=scroll,
+                buttons=[
+                    MDFlatButton(text='Close', text_color=self.theme_cls.primary_color, on_release=self._dismiss_dialog)
+                ],
+            )
+        self.stats_dialog.open()
+        if self._stats_loading:
+            # the load already running fills in the dialog
+            return
+        self._stats_loading = True
+        self.stats_label.text = 'Loading...'
+        # the first load after an import or update reads every license, so it has a thread of its own
+        threading.Thread(target=self._load_stats, daemon=True).start()
+
+    def _load_stats(self):
+        try:
+            with metrics.span('stats.report'):
+                text = report(self.license_db.stats())
+        except Exception as e:
+            Logger.exception('Callsigns: loading statistics failed')
+            text = f'Statistics could not be loaded:\n{e}'
+        Clock.schedule_once(lambda dt: self._on_stats_loaded(text))
+
+    def _on_stats_loaded(self, text: str):
+        self._stats_loading = False
+        self.stats_label.text = text
+
+    def show_diagnostics(self):
+        def export(inst):
+            path = pathlib.Path(self.user_data_dir) / f'diagnostics-{time.strftime("%Y%m%d-%H%M%S")}.jsonl'
+            spans = metrics.export_jsonl(path)
+            self.diagnostics_dialog.text = f'{metrics.report()}\n\nExported {spans} spans to {path}'
+
+        def reset(inst):
+            metrics.reset()
+            self.diagnostics_dialog.text = metrics.report()
+
+        if self.diagnostics_dialog is None:
+            self.diagnostics_dialog = MDDialog(
+                title='Diagnostics',
+                text='',
+                buttons=[
+                    MDFlatButton(text='Export', text_color=self.theme_cls.primary_color, on_release=export),
+                    MDFlatButton(text='Reset', text_color=self.theme_cls.primary_color, on_release=reset),
+                    MDFlatButton(
+                        text='Close', text_color=self.theme_cls.primary_color, on_release=self._dismiss_dialog
+                    ),
+                ],
+            )
+        self.diagnostics_dialog.text = metrics.report()
+        self.diagnostics_dialog.open()
 
 
 if __name__ == '__main__':
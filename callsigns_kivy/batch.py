@@ -0,0 +1,232 @@
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import re
+import sys
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+from .api import fetch_lookup
+from .api import LOOKUP_OK
+from .cache import CACHE_DB_FILE
+from .cache import CacheEntry
+from .cache import LookupCache
+from .core import Fetch
+from .core import fetch_and_store
+from .core import lookup_local
+from .core import LookupResult
+from .core import SOURCE_MISSING
+from .core import SOURCE_NETWORK
+from .core import Store
+from .records import LicenseRecord
+from .records import SYNTHETIC_FIELDS
+from .uls import LICENSE_DB_FILE
+from .uls import LicenseDatabase
+from .writer import StoreWriter
+
+DEFAULT_WORKERS = 8
+
+ADIF_EXTENSIONS = ('.adi', '.adif')
+
+# CSV header names recognised as the call sign column, compared case-insensitively
+CALL_SIGN_COLUMNS = ('call', 'callsign', 'call_sign', 'call sign')
+
+_ADIF_CALL = re.compile(r'<call:(\d+)(?::[^>]*)?>', re.IGNORECASE)
+_CALL_SIGN = re.compile(r'[A-Z0-9]+(?:/[A-Z0-9]+)*')
+
+BATCH_DESCRIPTION = 'Look up every call sign in a log (ADIF, CSV or one per line)'
+
+# progress(done, total, call_sign, found)
+Progress = Callable[[int, int, str, bool], None]
+
+
+def _unique(call_signs: Iterable[str]) -> list[str]:
+    seen: dict[str, None] = {}
+    for call_sign in call_signs:
+        call_sign = call_sign.strip().upper()
+        if call_sign and _CALL_SIGN.fullmatch(call_sign):
+            seen.setdefault(call_sign, None)
+    return list(seen)
+
+
+def parse_adif(text: str) -> list[str]:
+    call_signs = []
+    for match in _ADIF_CALL.finditer(text):
+        start = match.end()
+        stop = start + int(match.group(1))
+        call_signs.append(text[start:stop])
+    return _unique(call_signs)
+
+
+def parse_csv(text: str) -> list[str]:
+    rows = list(csv.reader(text.splitlines()))
+    if not rows:
+        return []
+    header = [name.strip().lower() for name in rows[0]]
+    for name in CALL_SIGN_COLUMNS:
+        if name in header:
+            column = header.index(name)
+            return _unique(row[column] for row in rows[1:] if len(row) > column)
+    # no recognised header: the first column holds the call signs
+    return _unique(row[0] for row in rows if row)
+
+
+def read_call_signs(path: str | os.PathLike) -> list[str]:
+    with open(path, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ADIF_EXTENSIONS or _ADIF_CALL.search(text):
+        return parse_adif(text)
+    if ext == '.csv':
+        return parse_csv(text)
+    return _unique(text.split())
+
+
+def run_batch(
+    call_signs: Iterable[str],
+    store: Store,
+    *,
+    db: LicenseDatabase | None = None,
+    workers: int = DEFAULT_WORKERS,
+    progress: Progress | None = None,
+    fetch: Fetch = fetch_lookup,
+) -> list[LookupResult]:
+    """
+    Look up many call signs: cache and local database first, the rest over a bounded worker pool
+
+    Results come back in input order. Network results are written to ``store`` as they arrive;
+    expired cache entries are revalidated rather than refetched.
+    """
+    call_signs = list(call_signs)
+    total = len(call_signs)
+    results: dict[str, LookupResult] = {}
+    done = 0
+
+    def report(result: LookupResult) -> None:
+        nonlocal done
+        results[result.call_sign] = result
+        done += 1
+        if progress is not None:
+            progress(done, total, result.call_sign, result.records is not None)
+
+    remaining: dict[str, CacheEntry | None] = {}
+    for call_sign in call_signs:
+        result, cached = lookup_local(call_sign, store, db)
+        if result is not None:
+            report(result)
+        else:
+            remaining[call_sign] = cached
+
+    if remaining:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fetch_and_store, call_sign, store, cached, fetch): call_sign
+                for call_sign, cached in remaining.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                call_sign = futures[future]
+                try:
+                    response = future.result()
+                except Exception:
+                    # one call sign that fails unexpectedly is reported missing rather than ending the run
+                    report(LookupResult(call_sign, None, SOURCE_MISSING))
+                    continue
+                if response.status == LOOKUP_OK:
+                    report(LookupResult(call_sign, response.data, SOURCE_NETWORK))
+                else:
+                    report(LookupResult(call_sign, None, SOURCE_MISSING))
+
+    return [results[call_sign] for call_sign in call_signs]
+
+
+def _enriched_row(result: LookupResult) -> dict[str, Any]:
+    if not result.records:
+        return {'call_sign': result.call_sign, 'source': result.source}
+    record = LicenseRecord.from_dict(result.records[-1])
+    return {**record.as_dict(include_synthetic=True), 'source': result.source}
+
+
+def enriched_rows(results: Iterable[LookupResult], current: dict[str, str] | None = None) -> Iterable[dict[str, Any]]:
+    # one row per call sign: its current (last) license, with the synthetic attributes. With
+    # ``current`` (logged call sign -> current call sign), one row per logged call sign instead
+    if current is None:
+        yield from map(_enriched_row, results)
+        return
+    rows = {result.call_sign: _enriched_row(result) for result in results}
+    for logged, call_sign in current.items():
+        yield {'logged_call_sign': logged, **rows[call_sign]}
+
+
+def write_results(
+    results: Iterable[LookupResult], path: str | os.PathLike, current: dict[str, str] | None = None
+) -> None:
+    rows = enriched_rows(results, current)
+    if os.path.splitext(path)[1].lower() in ('.json', '.jsonl'):
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        return
+    fieldnames = [*LicenseRecord._fields, *SYNTHETIC_FIELDS, 'source']
+    if current is not None:
+        fieldnames.insert(0, 'logged_call_sign')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def default_output_path(path: str | os.PathLike) -> str:
+    root, _ = os.path.splitext(os.fspath(path))
+    return f'{root}.enriched.csv'
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('log')
+    parser.add_argument('-o', '--output', help='CSV, or JSON lines if the name ends in .jsonl')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--cache', default=CACHE_DB_FILE)
+    parser.add_argument('--db', default=LICENSE_DB_FILE)
+    parser.add_argument(
+        '--current',
+        action='store_true',
+        help="look up each call sign's current holder (from the local database), e.g. after a vanity change",
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    def progress(done: int, total: int, call_sign: str, found: bool) -> None:
+        print(f'[{done}/{total}] {call_sign}{"" if found else " (not found)"}')
+
+    store = LookupCache.open(args.cache)
+    db = LicenseDatabase.open_if_exists(args.db)
+    call_signs = read_call_signs(args.log)
+    current = None
+    if args.current:
+        if db is None:
+            print(f'{args.db}: no local license database, so call signs are looked up as logged', file=sys.stderr)
+        else:
+            # one pass over the whole log; several logged call signs can lead to the same holder
+            current = db.normalize(call_signs)
+            call_signs = list(dict.fromkeys(current.values()))
+    # network results are committed a batch at a time rather than one transaction each
+    writer = StoreWriter(store)
+    try:
+        results = run_batch(call_signs, writer, db=db, workers=args.workers, progress=progress)
+    finally:
+        writer.close()
+    output = args.output or default_output_path(args.log)
+    write_results(results, output, current)
+    print(f'Wrote {output}')
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=BATCH_DESCRIPTION)
+    add_arguments(parser)
+    run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+import contextlib
+import email.utils
+import json
+import os
+import sqlite3
+import threading
+import time
+import typing
+import zlib
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import Self
+
+from .records import LicenseRecord
+from .records import SYNTHETIC_FIELDS
+
+CACHE_DB_FILE = 'callsigns.db'
+
+# the JsonStore file used by earlier versions; imported once into an empty cache
+LEGACY_JSON_FILE = 'callsigns.json'
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# used when the server sends no (or an unparseable) Expires header
+DEFAULT_TTL = 24 * 60 * 60
+
+# reads go through a memory map of (up to) this much of the file rather than read() calls
+DEFAULT_MMAP_BYTES = 64 * 1024 * 1024
+
+# The entry count and total size are kept in a one-row table by triggers, so opening a cache
+# does not scan it and every connection (the app, the CLI) sees the same totals.
+_TOTALS = '''
+CREATE TABLE totals (entries INTEGER NOT NULL, bytes INTEGER NOT NULL);
+INSERT INTO totals SELECT count(*), coalesce(sum(size), 0) FROM lookups;
+CREATE TRIGGER lookups_insert AFTER INSERT ON lookups BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + new.size;
+END;
+CREATE TRIGGER lookups_delete AFTER DELETE ON lookups BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - old.size;
+END;
+CREATE TRIGGER lookups_resize AFTER UPDATE OF size ON lookups BEGIN
+    UPDATE totals SET bytes = bytes - old.size + new.size;
+END;
+'''
+
+_SCHEMA = (
+    '''
+CREATE TABLE lookups (
+    id INTEGER PRIMARY KEY,
+    call_sign TEXT NOT NULL UNIQUE,
+    data BLOB NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX lookups_accessed ON lookups (accessed);
+'''
+    + _TOTALS
+)
+
+SCHEMA_VERSION = 2
+
+# Entry data is stored as the LicenseRecord fields in order, joined by a unit separator with
+# records joined by a record separator; absent (None) fields are a NUL and trailing ones are
+# dropped. Without the repeated key names this is about half the size of compact JSON, and
+# larger entries (long license histories) are deflated on top. Anything the format cannot
+# hold (non-string values, separator characters) is stored as JSON, as are the TEXT entries
+# of caches from before version 2.
+_FIELD_SEP = '\x1f'
+_RECORD_SEP = '\x1e'
+_ABSENT = '\x00'
+_FIELDS = LicenseRecord._fields
+_FIELD_SET = frozenset(_FIELDS)
+_PACKED = b'P'
+_DEFLATED = b'Z'
+_JSON = b'J'
+_DEFLATE_OVER = 512
+
+
+def _pack_record(record: dict[str, Any]) -> str | None:
+    if not _FIELD_SET.issuperset(record):
+        return None
+    values = [record.get(name) for name in _FIELDS]
+    while values and values[-1] is None:
+        values.pop()
+    present = [value for value in values if value is not None]
+    if not all(type(value) is str for value in present):
+        return None
+    text = ''.join(present)
+    if _FIELD_SEP in text or _RECORD_SEP in text or _ABSENT in text:
+        return None
+    return _FIELD_SEP.join(_ABSENT if value is None else value for value in values)
+
+
+def encode_data(data: list[dict[str, Any]]) -> bytes:
+    packed = [_pack_record(record) for record in data]
+    if not data or None in packed:
+        return _JSON + json.dumps(data, separators=(',', ':')).encode()
+    raw = _RECORD_SEP.join(packed).encode()
+    if len(raw) > _DEFLATE_OVER:
+        deflated = zlib.compress(raw)
+        if len(deflated) < len(raw):
+            return _DEFLATED + deflated
+    return _PACKED + raw
+
+
+def decode_data(blob: bytes | str) -> list[dict[str, Any]]:
+    if isinstance(blob, str):
+        return json.loads(blob)
+    kind, payload = blob[:1], blob[1:]
+    if kind == _JSON:
+        return json.loads(payload)
+    if kind == _DEFLATED:
+        payload = zlib.decompress(payload)
+    return [
+        {name: value for name, value in zip(_FIELDS, packed.split(_FIELD_SEP)) if value != _ABSENT}
+        for packed in payload.decode().split(_RECORD_SEP)
+    ]
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    # executescript() would commit the migration's transaction first, so run one statement at a time
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+
+
+def _repack(conn: sqlite3.Connection) -> None:
+    # version 1 -> 2: JSON text to the packed format, and the totals table
+    rows = conn.execute('SELECT id, data FROM lookups').fetchall()
+    for row_id, data in rows:
+        encoded = encode_data(json.loads(data))
+        conn.execute('UPDATE lookups SET data = ?, size = ? WHERE id = ?', (encoded, len(encoded), row_id))
+    _execute_script(conn, _TOTALS)
+
+
+# indexed by the version a cache is at; each step brings it to the next
+_MIGRATIONS: list[str | Callable[[sqlite3.Connection], None]] = [
+    'ALTER TABLE lookups ADD COLUMN etag TEXT;\nALTER TABLE lookups ADD COLUMN last_modified TEXT;',
+    _repack,
+]
+
+
+class CacheEntry(typing.NamedTuple):
+    call_sign: str
+    data: list[dict[str, Any]]
+    expires: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def expired(self) -> bool:
+        return self.expires <= time.time()
+
+
+def parse_expires(expires: str | None, now: float | None = None) -> float:
+    now = time.time() if now is None else now
+    if expires:
+        try:
+            return email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return now + DEFAULT_TTL
+
+
+class LookupCache:
+    """
+    Lookup results keyed by call sign, persisted one row at a time in SQLite
+
+    Entries carry the server's ``Expires`` time; expired entries are still returned (flagged
+    via :attr:`CacheEntry.expired`) so callers can revalidate and fall back to them when offline.
+    The least recently used entries are evicted beyond ``max_entries`` or ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike = CACHE_DB_FILE,
+        *,
+        max_entries: int | None = DEFAULT_MAX_ENTRIES,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # shared by the UI thread and batch/index workers; the lock keeps the size accounting consistent
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.execute(f'PRAGMA mmap_size = {DEFAULT_MMAP_BYTES}')
+        self._migrate()
+
+    def _migrate(self) -> None:
+        (version,) = self._conn.execute('PRAGMA user_version').fetchone()
+        if version == SCHEMA_VERSION:
+            return
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lookups'").fetchone()
+        # a cache is either fully migrated or left as it was
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            if exists is None:
+                _execute_script(self._conn, _SCHEMA)
+            else:
+                for step in _MIGRATIONS[version:]:
+                    if callable(step):
+                        step(self._conn)
+                    else:
+                        _execute_script(self._conn, step)
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def get(self, call_sign: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, expires, etag, last_modified FROM lookups WHERE call_sign = ?', (call_sign,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE lookups SET accessed = ? WHERE call_sign = ?', (time.time(), call_sign))
+        data, expires, etag, last_modified = row
+        return CacheEntry(call_sign, decode_data(data), expires, etag, last_modified)
+
+    def put(
+        self,
+        call_sign: str,
+        data: list[dict[str, Any]],
+        expires: str | float | None = None,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        now = time.time()
+        if not isinstance(expires, (int, float)):
+            expires = parse_expires(expires, now)
+        encoded = encode_data(data)
+        size = len(encoded)
+        with self._lock:
+            # an upsert keeps the row id, so a refreshed entry keeps its place in the history order
+            self._conn.execute(
+                'INSERT INTO lookups (call_sign, data, expires, accessed, size, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (call_sign) DO UPDATE SET '
+                'data = excluded.data, expires = excluded.expires, accessed = excluded.accessed, size = excluded.size, '
+                'etag = excluded.etag, last_modified = excluded.last_modified',
+                (call_sign, encoded, expires, now, size, etag, last_modified),
+            )
+            self._evict()
+
+    def touch(
+        self,
+        call_sign: str,
+        expires: str | float | None = None,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> bool:
+        # a 304 revalidation: keep the data, push the expiry out, take any new validators; False if gone
+        now = time.time()
+        if not isinstance(expires, (int, float)):
+            expires = parse_expires(expires, now)
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE lookups SET expires = ?, accessed = ?, etag = coalesce(?, etag), '
+                'last_modified = coalesce(?, last_modified) WHERE call_sign = ?',
+                (expires, now, etag, last_modified, call_sign),
+            )
+        return cursor.rowcount > 0
+
+    def _totals(self) -> tuple[int, int]:
+        return self._conn.execute('SELECT entries, bytes FROM totals').fetchone()
+
+    def _over_budget(self, entries: int, size: int) -> bool:
+        if self.max_entries is not None and entries > self.max_entries:
+            return True
+        return self.max_bytes is not None and size > self.max_bytes
+
+    def _evict(self) -> None:
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        entries, size = self._totals()
+        while self._over_budget(entries, size) and entries > 1:
+            row_id, row_size = self._conn.execute('SELECT id, size FROM lookups ORDER BY accessed LIMIT 1').fetchone()
+            self._conn.execute('DELETE FROM lookups WHERE id = ?', (row_id,))
+            entries, size = entries - 1, size - row_size
+
+    def delete(self, call_sign: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM lookups WHERE call_sign = ?', (call_sign,))
+
+    def exists(self, call_sign: str) -> bool:
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM lookups WHERE call_sign = ?', (call_sign,)).fetchone()
+        return row is not None
+
+    def items(self) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+        # insertion order, oldest first, like the JsonStore this replaces
+        with self._lock:
+            rows = self._conn.execute('SELECT call_sign, data FROM lookups ORDER BY id').fetchall()
+        for call_sign, data in rows:
+            yield call_sign, decode_data(data)
+
+    def call_signs(self) -> list[str]:
+        # insertion order, without decoding any entries
+        with self._lock:
+            return [call_sign for (call_sign,) in self._conn.execute('SELECT call_sign FROM lookups ORDER BY id')]
+
+    def page(self, before_id: int | None = None, limit: int = 50) -> list[tuple[int, str, list[dict[str, Any]]]]:
+        # newest first; pass the last id of a page as ``before_id`` to continue
+        if before_id is None:
+            before_id = 2**63 - 1
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, call_sign, data FROM lookups WHERE id < ? ORDER BY id DESC LIMIT ?', (before_id, limit)
+            ).fetchall()
+        return [(row_id, call_sign, decode_data(data)) for row_id, call_sign, data in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._totals()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._totals()[1]
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        # writes made inside are committed together, or not at all; other threads wait for it
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                yield
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def import_json_store(self, path: str | os.PathLike = LEGACY_JSON_FILE) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            legacy = json.load(f)
+        # one transaction for the lot rather than one per entry
+        with self.transaction():
+            for call_sign, entry in legacy.items():
+                # older versions stored the synthetic attributes too; without them entries take the packed encoding
+                data = [{k: v for k, v in lic_data.items() if k not in SYNTHETIC_FIELDS} for lic_data in entry['data']]
+                self.put(call_sign, data, entry.get('expires'))
+        return len(legacy)
+
+    @classmethod
+    def open(
+        cls,
+        path: str | os.PathLike = CACHE_DB_FILE,
+        legacy_path: str | os.PathLike = LEGACY_JSON_FILE,
+        **kwargs: Any,
+    ) -> Self:
+        cache = cls(path, **kwargs)
+        if not len(cache):
+            cache.import_json_store(legacy_path)
+        return cache
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,145 @@
+import functools
+import heapq
+import itertools
+import operator
+from array import array
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+from .records import MORSE_TABLE
+from .records import PHONETIC_WORDS
+from .records import SYLLABLE_LENGTHS
+
+# Per-character attributes are precomputed into 256-entry byte tables. A numeric column is
+# then map(sum, map(bytes.translate, call_signs, tables)): translating a call sign replaces
+# each character by its value and sum() adds the bytes up, so the whole column is computed in
+# C without a Python-level dict lookup per character.
+
+_SEPARATOR = '\n'
+
+# standard timing: dit = 1 unit, dah = 3, 1 unit between elements, 3 between characters
+DIT_UNITS = 1
+DAH_UNITS = 3
+ELEMENT_GAP_UNITS = 1
+CHARACTER_GAP_UNITS = 3
+
+
+def char_table(values: dict[str, int]) -> bytes:
+    table = bytearray(256)
+    for char, value in values.items():
+        table[ord(char)] = value
+    return bytes(table)
+
+
+def _morse_units(code: str) -> int:
+    return code.count('.') * DIT_UNITS + code.count('-') * DAH_UNITS + (len(code) - 1) * ELEMENT_GAP_UNITS
+
+
+DITS_TABLE = char_table({c: code.count('.') for c, code in MORSE_TABLE.items()})
+DAHS_TABLE = char_table({c: code.count('-') for c, code in MORSE_TABLE.items()})
+MORSE_UNITS_TABLE = char_table({c: _morse_units(code) for c, code in MORSE_TABLE.items()})
+SYLLABLES_TABLE = char_table(SYLLABLE_LENGTHS)
+
+# letters -> 'A', digits -> '0'; the resulting shape (e.g. b'AA0AAA') determines the format
+_SHAPE_TABLE = bytes.maketrans(
+    ''.join(MORSE_TABLE).encode('ascii'), ''.join('A' if c.isalpha() else '0' for c in MORSE_TABLE).encode('ascii')
+)
+_MORSE_TRANSLATION = str.maketrans({c: f'{code} ' for c, code in MORSE_TABLE.items()})
+_PHONETIC_TRANSLATION = str.maketrans({c: f'{word} ' for c, word in PHONETIC_WORDS.items()})
+
+
+@functools.cache
+def shape_format(shape: bytes) -> str:
+    # same result as LicenseRecord.format: leading letters, a digit, then letters
+    rest = shape.lstrip(b'A')
+    prefix = len(shape) - len(rest)
+    if not prefix or not rest.startswith(b'0'):
+        return ''
+    suffix = len(rest) - 1 - len(rest[1:].lstrip(b'A'))
+    if not suffix:
+        return ''
+    return f'{prefix}x{suffix}'
+
+
+class CallSignColumns:
+    """
+    Synthetic call sign attributes for many call signs, computed column-wise
+
+    Columns are computed on first access and kept; numeric columns are compact ``array``s
+    in the same order as :attr:`call_signs`.
+    """
+
+    def __init__(self, call_signs: Iterable[str]):
+        self.call_signs: list[str] = list(call_signs)
+        self._encoded = [call_sign.encode('ascii') for call_sign in self.call_signs]
+
+    def __len__(self) -> int:
+        return len(self.call_signs)
+
+    def sum_column(self, table: bytes, typecode: str = 'H') -> array:
+        return array(typecode, map(sum, self._translate(table)))
+
+    def _translate(self, table: bytes) -> Iterable[bytes]:
+        return map(bytes.translate, self._encoded, itertools.repeat(table))
+
+    def _translate_joined(self, table: dict[int, str]) -> list[str]:
+        # one str.translate over all call signs, then split back apart
+        if not self.call_signs:
+            return []
+        return _SEPARATOR.join(self.call_signs).translate(table).split(_SEPARATOR)
+
+    @functools.cached_property
+    def lengths(self) -> array:
+        return array('B', map(len, self.call_signs))
+
+    @functools.cached_property
+    def morse_dits(self) -> array:
+        return self.sum_column(DITS_TABLE)
+
+    @functools.cached_property
+    def morse_dahs(self) -> array:
+        return self.sum_column(DAHS_TABLE)
+
+    @functools.cached_property
+    def morse_units(self) -> array:
+        # total CW duration including inter-character gaps
+        gap_counts = map(operator.sub, self.lengths, map(bool, self.lengths))
+        gaps = map(operator.mul, gap_counts, itertools.repeat(CHARACTER_GAP_UNITS))
+        return array('H', map(operator.add, self.sum_column(MORSE_UNITS_TABLE), gaps))
+
+    @functools.cached_property
+    def syllable_length(self) -> array:
+        return self.sum_column(SYLLABLES_TABLE)
+
+    def get_syllable_length(self, lengths: dict[str, int]) -> array:
+        return self.sum_column(char_table(lengths))
+
+    @functools.cached_property
+    def format(self) -> list[str]:
+        return list(map(shape_format, self._translate(_SHAPE_TABLE)))
+
+    @functools.cached_property
+    def call_sign_morse(self) -> list[str]:
+        return list(map(str.rstrip, self._translate_joined(_MORSE_TRANSLATION)))
+
+    @functools.cached_property
+    def phonetic(self) -> list[str]:
+        return list(map(str.rstrip, self._translate_joined(_PHONETIC_TRANSLATION)))
+
+    def rank(
+        self,
+        by: Sequence[str] = ('morse_units', 'syllable_length'),
+        *,
+        formats: Iterable[str] | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """
+        Call signs ordered by the named columns (ascending), optionally restricted to some formats
+        """
+        keys = [getattr(self, name) for name in by]
+        rows: Iterable[tuple] = zip(*keys, self.call_signs)
+        if formats is not None:
+            wanted = frozenset(formats)
+            rows = itertools.compress(rows, map(wanted.__contains__, self.format))
+        ranked = sorted(rows) if limit is None else heapq.nsmallest(limit, rows)
+        return [row[-1] for row in ranked]
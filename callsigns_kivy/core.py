@@ -0,0 +1,251 @@
+import time
+import typing
+from collections.abc import Callable
+from typing import Any
+
+from .api import fetch_lookup
+from .api import find_fcc_licenses
+from .api import LOOKUP_ERROR
+from .api import LOOKUP_NOT_FOUND
+from .api import LOOKUP_NOT_MODIFIED
+from .api import LOOKUP_OK
+from .api import LookupResponse
+from .api import Validators
+from .cache import CacheEntry
+from .cache import LookupCache
+from .metrics import metrics
+from .records import LICENSE_STATUS_CODES
+from .records import LicenseRecord
+from .uls import DEFAULT_PAGE_SIZE
+from .uls import LicenseDatabase
+from .uls import REVERSE_INDEXES
+from .writer import StoreWriter
+
+# The lookup chain shared by the app, the batch runner and the command line. Nothing here
+# (or in the modules it imports) may import kivy.
+
+SOURCE_CACHE = 'cache'
+SOURCE_DATABASE = 'database'
+SOURCE_NETWORK = 'network'
+SOURCE_FCC = 'fcc'
+SOURCE_MISSING = 'missing'
+
+_STATUS_COUNTERS = {LOOKUP_OK: 'lookup.network', LOOKUP_NOT_FOUND: 'lookup.missing', LOOKUP_ERROR: 'lookup.error'}
+
+Fetch = Callable[[str, Validators | None], LookupResponse]
+
+# the lookup chain reads and writes the cache directly or through a write-behind StoreWriter
+Store = LookupCache | StoreWriter
+
+# FCC fallback results are cached for this long; they are sparse stand-ins until the lookup
+# endpoint (which usually lags new grants by a day or so) knows the call sign
+FCC_CACHE_TTL = 24 * 60 * 60
+
+# reverse lookups are typed as key:value, e.g. zip:98101 or trustee:W1AW
+REVERSE_QUERY_SEPARATOR = ':'
+
+# (cursor, call sign, records) rows, as LookupCache.page returns them; the last cursor continues
+Page = list[tuple[int, str, list[dict[str, Any]]]]
+
+
+class LookupResult(typing.NamedTuple):
+    call_sign: str
+    records: list[dict[str, Any]] | None
+    source: str  # one of the SOURCE_* constants
+
+
+class LookupView(typing.NamedTuple):
+    # a result ready to show: everything but setting label texts is done before it reaches the UI
+    result: LookupResult
+    info: dict[str, str]  # describe()'s lines; empty when there are no records
+
+
+def lookup_local(
+    call_sign: str, store: Store, db: LicenseDatabase | None = None
+) -> tuple[LookupResult | None, CacheEntry | None]:
+    """
+    Answer from a fresh cache entry or the local license database, without touching the network
+
+    Also returns the cache entry (possibly expired) so a network lookup can revalidate it.
+    """
+    with metrics.span('cache.get'):
+        cached = store.get(call_sign)
+    if cached is not None and not cached.expired:
+        metrics.count('lookup.cache')
+        return LookupResult(call_sign, cached.data, SOURCE_CACHE), cached
+    if db is not None:
+        with metrics.span('database.lookup'):
+            records = db.lookup(call_sign)
+            data = [record.as_dict(compact=True) for record in records]
+        if data:
+            metrics.count('lookup.database')
+            return LookupResult(call_sign, data, SOURCE_DATABASE), cached
+    return None, cached
+
+
+def fetch_and_store(
+    call_sign: str, store: Store, cached: CacheEntry | None = None, fetch: Fetch = fetch_lookup
+) -> LookupResponse:
+    """
+    Fetch ``call_sign`` from the endpoint, conditionally if ``cached``, and update ``store``
+
+    A 304 comes back as LOOKUP_OK carrying the cached records, so the status is always one of
+    LOOKUP_OK, LOOKUP_NOT_FOUND or LOOKUP_ERROR.
+    """
+    validators = Validators(cached.etag, cached.last_modified) if cached is not None else None
+    with metrics.span('fetch', conditional=validators is not None):
+        response = fetch(call_sign, validators)
+    if response.status == LOOKUP_NOT_MODIFIED:
+        if cached is None:
+            metrics.count('lookup.error')
+            return LookupResponse(LOOKUP_ERROR)
+        metrics.count('lookup.revalidated')
+        etag, last_modified = response.validators
+        store.touch(call_sign, response.expires, etag=etag, last_modified=last_modified)
+        return response._replace(status=LOOKUP_OK, data=cached.data)
+    metrics.count(_STATUS_COUNTERS[response.status])
+    if response.status == LOOKUP_OK:
+        etag, last_modified = response.validators
+        with metrics.span('store.put'):
+            store.put(call_sign, response.data, response.expires, etag=etag, last_modified=last_modified)
+    return response
+
+
+def lookup_remote(
+    call_sign: str,
+    store: Store,
+    cached: CacheEntry | None = None,
+    *,
+    offline: bool = False,
+    fetch: Fetch = fetch_lookup,
+) -> LookupResult:
+    # the network half of lookup(): an expired entry is served when the endpoint can't be reached
+    if offline:
+        response = LookupResponse(LOOKUP_ERROR)
+    else:
+        response = fetch_and_store(call_sign, store, cached, fetch)
+    if response.status == LOOKUP_OK:
+        return LookupResult(call_sign, response.data, SOURCE_NETWORK)
+    if response.status == LOOKUP_NOT_FOUND:
+        if cached is not None:
+            store.delete(call_sign)
+        return LookupResult(call_sign, None, SOURCE_MISSING)
+    if cached is not None:
+        return LookupResult(call_sign, cached.data, SOURCE_CACHE)
+    return LookupResult(call_sign, None, SOURCE_MISSING)
+
+
+def lookup(
+    call_sign: str,
+    store: Store,
+    db: LicenseDatabase | None = None,
+    *,
+    offline: bool = False,
+    fetch: Fetch = fetch_lookup,
+) -> LookupResult:
+    # the whole chain, blocking
+    call_sign = call_sign.strip().upper()
+    result, cached = lookup_local(call_sign, store, db)
+    if result is not None:
+        return result
+    return lookup_remote(call_sign, store, cached, offline=offline, fetch=fetch)
+
+
+def fcc_fallback(
+    call_sign: str, store: Store, *, find: Callable[[str], LookupResponse] = find_fcc_licenses
+) -> tuple[str, LookupResult]:
+    """
+    Look ``call_sign`` up in the FCC License View API and cache what it finds for FCC_CACHE_TTL
+
+    Returns the lookup status (LOOKUP_OK, LOOKUP_NOT_FOUND or LOOKUP_ERROR) with the result;
+    a fresh cache entry answers without calling the API.
+    """
+    call_sign = call_sign.strip().upper()
+    cached = store.get(call_sign)
+    if cached is not None and not cached.expired:
+        metrics.count('lookup.cache')
+        return LOOKUP_OK, LookupResult(call_sign, cached.data, SOURCE_CACHE)
+    with metrics.span('fcc.lookup'):
+        response = find(call_sign)
+    metrics.count(f'fcc.{response.status}')
+    if response.status != LOOKUP_OK:
+        return response.status, LookupResult(call_sign, None, SOURCE_MISSING)
+    store.put(call_sign, response.data, time.time() + FCC_CACHE_TTL)
+    return LOOKUP_OK, LookupResult(call_sign, response.data, SOURCE_FCC)
+
+
+def parse_reverse_query(text: str) -> tuple[str, str] | None:
+    key, separator, value = text.partition(REVERSE_QUERY_SEPARATOR)
+    key = key.strip().lower()
+    if not separator or key not in REVERSE_INDEXES or not value.strip():
+        return None
+    return key, value.strip()
+
+
+def reverse_page(
+    db: LicenseDatabase, key: str, value: str, after: int | None = None, limit: int = DEFAULT_PAGE_SIZE
+) -> Page:
+    # one license per row, so a row's records are just that license
+    with metrics.span('database.find', key=key):
+        records = db.find(key, value, after=after, limit=limit)
+    return [(int(record.system_identifier), record.call_sign, [record.as_dict(compact=True)]) for record in records]
+
+
+def describe_records(records: list[dict[str, Any]], db: LicenseDatabase | None = None) -> dict[str, str]:
+    # describe(), with the holder's earlier call signs when there is a local license database
+    lineage = db.lineage(records[-1]['call_sign']) if db is not None else None
+    return describe(records, lineage)
+
+
+def lookup_view(result: LookupResult, db: LicenseDatabase | None = None) -> LookupView:
+    return LookupView(result, describe_records(result.records, db) if result.records else {})
+
+
+def format_name(record_data: dict[str, Any]) -> str:
+    return ' '.join(
+        i for i in (record_data.get('first_name'), record_data.get('middle_initial'), record_data.get('last_name')) if i
+    )
+
+
+def format_address(record_data: dict[str, Any]) -> str:
+    city_line = ', '.join(
+        i
+        for i in (
+            record_data.get('city'),
+            ' '.join(i for i in (record_data.get('state'), record_data.get('zip_code')) if i),
+        )
+        if i
+    )
+    po_box = record_data.get('po_box')
+    return '\n'.join(
+        i
+        for i in (
+            format_name(record_data),
+            record_data.get('street_address'),
+            record_data.get('attn_line'),
+            f'PO Box {po_box}' if po_box else '',
+            city_line,
+        )
+        if i
+    )
+
+
+def describe(records: list[dict[str, Any]], lineage: list[str] | None = None) -> dict[str, str]:
+    # display lines for the current (last) license, keyed by field; empty values are not shown.
+    # ``lineage`` is the call signs the holder has had, oldest first (LicenseDatabase.lineage)
+    record = LicenseRecord.from_dict(records[-1])
+    current = record.as_dict()
+    status = LICENSE_STATUS_CODES.get(current['status'], current['status'])
+    cancelled = current['cancellation_date']
+    return {
+        'call_sign': current['call_sign'] + (' (vanity)' if current['vanity'] else ''),
+        'addr': format_address(current),
+        'status': f'Status: {status}' if status else '',
+        'frn': f"FRN: {current['frn']}" if current['frn'] else '',
+        'grant_date': f"Grant Date: {current['grant_date']}" if current['grant_date'] else '',
+        'expired_date': f"Expiration: {current['expired_date']}" if current['expired_date'] else '',
+        'cancellation_date': f'Cancellation Date: {cancelled}' if cancelled else '',
+        'operator_class': f"Operator Class: {current['operator_class']}" if current['operator_class'] else '',
+        'phonetic': f'phonetic: {record.phonetic}',
+        'lineage': f"Lineage: {' -> '.join(lineage)}" if lineage and len(lineage) > 1 else '',
+    }
@@ -0,0 +1,97 @@
+import collections
+import threading
+import typing
+from collections.abc import Callable
+from collections.abc import Hashable
+
+T = typing.TypeVar('T')
+
+Callback = Callable[[T], None]
+
+# fetch(key, done): start fetching ``key`` and call ``done(result)`` exactly once when finished
+Fetch = Callable[[Hashable, Callback[T]], None]
+
+DEFAULT_MAX_CONCURRENT = 4
+
+
+class LookupDispatcher(typing.Generic[T]):
+    """
+    Coalesces concurrent requests for the same key and caps the number of fetches in flight
+
+    A request for a key that is already queued or being fetched waits on that fetch instead
+    of starting another; every waiter receives the same result. Requests beyond
+    ``max_concurrent`` wait in FIFO order.
+    """
+
+    def __init__(self, fetch: Fetch[T], max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        self._fetch = fetch
+        self.max_concurrent = max_concurrent
+        self._waiters: dict[Hashable, list[Callback[T]]] = {}
+        self._queue: collections.deque[Hashable] = collections.deque()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def request(self, key: Hashable, callback: Callback[T]) -> bool:
+        """
+        Register ``callback`` for ``key``; returns False if it joined a fetch already pending
+        """
+        with self._lock:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.append(callback)
+                return False
+            self._waiters[key] = [callback]
+            self._queue.append(key)
+        self._pump()
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._waiters
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def _pump(self) -> None:
+        while True:
+            with self._lock:
+                if self._active >= self.max_concurrent or not self._queue:
+                    return
+                key = self._queue.popleft()
+                self._active += 1
+            try:
+                self._fetch(key, self._completion(key))
+            except BaseException:
+                with self._lock:
+                    self._active -= 1
+                    self._waiters.pop(key, None)
+                raise
+
+    def _completion(self, key: Hashable) -> Callback[T]:
+        finished = False
+
+        def done(result: T) -> None:
+            nonlocal finished
+            # a fetch that calls back more than once (say, from a result handler and again from its
+            # error handler) must not release its slot twice; only the first result counts
+            if finished:
+                return
+            finished = True
+            self._done(key, result)
+
+        return done
+
+    def _done(self, key: Hashable, result: T) -> None:
+        with self._lock:
+            self._active -= 1
+            waiters = self._waiters.pop(key, [])
+        try:
+            for callback in waiters:
+                callback(result)
+        finally:
+            self._pump()
@@ -0,0 +1,222 @@
+import bisect
+import itertools
+import re
+import typing
+from array import array
+from collections.abc import Iterable
+
+from .records import MORSE_TABLE
+from .records import PHONETIC_WORDS
+from .records import SYLLABLE_LENGTHS
+
+ALPHABET = ''.join(MORSE_TABLE)
+
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_LIMIT = 5
+
+# A substitution that is easy to make over the air costs less than any other edit, so among
+# candidates the same number of edits away, the likelier mistakes rank first.
+MORSE_CONFUSION_COST = 0.5
+PHONETIC_CONFUSION_COST = 0.6
+
+# Index entries are fingerprint << _ID_BITS | position, split into partitions by the top bits
+# of the fingerprint so that each partition is small enough to sort and insert into cheaply.
+_ID_BITS = 24
+_FINGERPRINT_BITS = 63 - _ID_BITS
+_PARTITION_BITS = 12
+_FINGERPRINT_MASK = (1 << _FINGERPRINT_BITS) - 1
+_ID_MASK = (1 << _ID_BITS) - 1
+_PARTITION_SHIFT = _FINGERPRINT_BITS - _PARTITION_BITS
+
+
+def morse_confusions() -> set[frozenset[str]]:
+    # characters whose codes are the same length and differ in one element, e.g. D (-..) and G (--.)
+    return {
+        frozenset((a, b))
+        for (a, code_a), (b, code_b) in itertools.combinations(MORSE_TABLE.items(), 2)
+        if len(code_a) == len(code_b) and sum(x != y for x, y in zip(code_a, code_b)) == 1
+    }
+
+
+def _rhyme(word: str) -> str:
+    # the last vowel group and what follows it, e.g. 'ilo' -> 'o', 'Mike' -> 'e'
+    return re.search(r'[aeiouy]+[^aeiouy]*$', word.lower()).group()
+
+
+def phonetic_confusions() -> set[frozenset[str]]:
+    # characters whose phonetic words have as many syllables and end alike, e.g. Kilo and Echo
+    groups: dict[tuple[int, str], list[str]] = {}
+    for char, word in PHONETIC_WORDS.items():
+        groups.setdefault((SYLLABLE_LENGTHS[char], _rhyme(word)), []).append(char)
+    return {frozenset(pair) for chars in groups.values() for pair in itertools.combinations(chars, 2)}
+
+
+def _substitution_costs() -> dict[tuple[str, str], float]:
+    costs = {}
+    for pairs, cost in ((phonetic_confusions(), PHONETIC_CONFUSION_COST), (morse_confusions(), MORSE_CONFUSION_COST)):
+        for a, b in map(tuple, pairs):
+            costs[a, b] = costs[b, a] = min(cost, costs.get((a, b), cost))
+    return costs
+
+
+SUBSTITUTION_COSTS = _substitution_costs()
+
+
+def _trim(a: str, b: str) -> tuple[str, str]:
+    # a shared prefix and suffix never change an edit distance; near misses are mostly that
+    shortest = min(len(a), len(b))
+    start = 0
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a_stop, b_stop = len(a) - end, len(b) - end
+    return a[start:a_stop], b[start:b_stop]
+
+
+def weighted_distance(a: str, b: str) -> float:
+    """
+    Levenshtein distance with Morse and phonetic confusions costing less than other substitutions
+    """
+    a, b = _trim(a, b)
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            substitution = previous[j - 1]
+            if char_a != char_b:
+                substitution += SUBSTITUTION_COSTS.get((char_a, char_b), 1)
+            current.append(min(previous[j] + 1, current[j - 1] + 1, substitution))
+        previous = current
+    return previous[-1]
+
+
+def levenshtein(a: str, b: str, bound: int | None = None) -> int:
+    """
+    Plain edit distance, or ``bound + 1`` as soon as it is known to be more than ``bound``
+    """
+    a, b = _trim(a, b)
+    if bound is not None and abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, char_b in enumerate(b):
+            cost = previous[j] + (char_a != char_b)
+            if previous[j + 1] < cost:
+                cost = previous[j + 1] + 1
+            if left < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        if bound is not None and min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletions(word: str) -> list[str]:
+    # the word itself and every string one deletion away from it
+    return [word, *(word[:i] + word[j:] for i, j in enumerate(range(1, len(word) + 1)))]
+
+
+def _edits(word: str) -> set[str]:
+    # every string at most one insertion, deletion or substitution away
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    edits = {word}
+    edits.update(head + tail[1:] for head, tail in splits if tail)
+    edits.update(head + c + tail[1:] for head, tail in splits if tail for c in ALPHABET)
+    edits.update(head + c + tail for head, tail in splits for c in ALPHABET)
+    return edits
+
+
+def _fingerprint(variant: str) -> int:
+    return hash(variant) & _FINGERPRINT_MASK
+
+
+class Match(typing.NamedTuple):
+    call_sign: str
+    distance: float  # weighted
+    edits: int
+
+
+class FuzzyIndex:
+    """
+    Deletion-neighbourhood index for the known call signs a typo or two away from a query
+
+    Every call sign is entered under a fingerprint of itself and of each string one deletion
+    away from it. Two strings one edit apart share one of those; for two edits, the query side
+    first expands to every string one edit away and probes with each of their deletions. That
+    is a few thousand probes for a two-edit search, however many call signs there are, and the
+    index costs 8 bytes per entry (about 56 for a six-character call sign).
+
+    Fingerprints are only good for this process (``hash`` is salted per run), which is fine as
+    the index is rebuilt at startup like the rest of :class:`~.search.CallSignIndex`.
+    """
+
+    def __init__(self, call_signs: Iterable[str] = ()):
+        self._keys = list(call_signs)
+        partitions = [array('q') for _ in range(1 << _PARTITION_BITS)]
+        appends = [partition.append for partition in partitions]
+        for position, call_sign in enumerate(self._keys):
+            for fingerprint in map(_fingerprint, _deletions(call_sign)):
+                appends[fingerprint >> _PARTITION_SHIFT](fingerprint << _ID_BITS | position)
+        self._partitions = [array('q', sorted(partition)) for partition in partitions]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, call_sign: str) -> None:
+        position = len(self._keys)
+        self._keys.append(call_sign)
+        for variant in _deletions(call_sign):
+            fingerprint = _fingerprint(variant)
+            bisect.insort(self._partitions[fingerprint >> _PARTITION_SHIFT], fingerprint << _ID_BITS | position)
+
+    def _probe(self, variant: str) -> Iterable[int]:
+        fingerprint = _fingerprint(variant)
+        partition = self._partitions[fingerprint >> _PARTITION_SHIFT]
+        start = bisect.bisect_left(partition, fingerprint << _ID_BITS)
+        end = bisect.bisect_right(partition, fingerprint << _ID_BITS | _ID_MASK, lo=start)
+        return (entry & _ID_MASK for entry in partition[start:end])
+
+    def candidates(self, call_sign: str, max_distance: int = DEFAULT_MAX_DISTANCE) -> set[str]:
+        # a superset of the call signs within max_distance edits (plus fingerprint collisions)
+        if not 0 <= max_distance <= 2:
+            raise ValueError(f'max_distance must be 0, 1 or 2, not {max_distance}')
+        if max_distance == 2:
+            probes = {variant for edit in _edits(call_sign) for variant in _deletions(edit)}
+        elif max_distance == 1:
+            probes = set(_deletions(call_sign))
+        else:
+            probes = {call_sign}
+        positions = set(itertools.chain.from_iterable(map(self._probe, probes)))
+        return {self._keys[position] for position in positions}
+
+    def _within(self, call_sign: str, max_distance: int) -> list[Match]:
+        matches = []
+        for candidate in self.candidates(call_sign, max_distance):
+            if candidate == call_sign:
+                continue
+            edits = levenshtein(call_sign, candidate, max_distance)
+            if edits <= max_distance:
+                matches.append(Match(candidate, weighted_distance(call_sign, candidate), edits))
+        return matches
+
+    def search(
+        self, call_sign: str, limit: int | None = DEFAULT_LIMIT, max_distance: int = DEFAULT_MAX_DISTANCE
+    ) -> list[Match]:
+        """
+        Known call signs within ``max_distance`` edits of ``call_sign`` (not itself), nearest first
+        """
+        call_sign = call_sign.upper()
+        # one edit costs at most 1 and two at least 1, so one-edit matches always rank first and
+        # the much slower two-edit search is only needed when there are too few of them
+        for distance in range(min(max_distance, 1), max_distance + 1):
+            matches = self._within(call_sign, distance)
+            if limit is not None and len(matches) >= limit:
+                break
+        matches.sort(key=lambda match: (match.distance, match.edits, match.call_sign))
+        return matches[:limit]
@@ -0,0 +1,130 @@
+import http.client
+import threading
+import time
+import typing
+import urllib.parse
+from collections.abc import Mapping
+
+from .metrics import metrics
+
+DEFAULT_TIMEOUT = 10
+
+# idle keep-alive connections kept per host
+DEFAULT_MAX_IDLE_PER_HOST = 4
+
+USER_AGENT = 'callsigns-kivy'
+
+_RETRYABLE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+_Key = tuple[str, str, int]
+
+
+class HTTPResponse(typing.NamedTuple):
+    status: int
+    headers: dict[str, str]  # lower-cased names
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class HTTPClient:
+    """
+    Minimal thread-safe HTTP/1.1 client that reuses keep-alive connections per host
+
+    Each request borrows an idle connection to the host (or opens one) and returns it once
+    the response has been read, so repeated lookups skip the TCP and TLS handshakes. A
+    request on a reused connection that the server has since closed is retried once on a
+    fresh connection.
+    """
+
+    def __init__(self, *, timeout: float = DEFAULT_TIMEOUT, max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[_Key, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    @staticmethod
+    def _key(parts: urllib.parse.SplitResult) -> _Key:
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f'Unsupported URL scheme {scheme!r}')
+        port = parts.port or (443 if scheme == 'https' else 80)
+        return scheme, parts.hostname or '', port
+
+    def _acquire(self, key: _Key) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+        scheme, host, port = key
+        conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return conn_class(host, port, timeout=self.timeout), False
+
+    def _release(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url: str, headers: Mapping[str, str] | None = None, method: str = 'GET') -> HTTPResponse:
+        parts = urllib.parse.urlsplit(url)
+        key = self._key(parts)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        request_headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity', **(headers or {})}
+        start = time.perf_counter()
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                if not reused:
+                    # DNS, TCP and TLS: what keeping connections alive saves
+                    with metrics.span('http.connect', host=key[1]):
+                        conn.connect()
+                conn.request(method, path, headers=request_headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except _RETRYABLE:
+                conn.close()
+                if reused:
+                    # the server dropped an idle connection; that says nothing about this request
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            response_headers = {name.lower(): value for name, value in resp.getheaders()}
+            metrics.record('http.request', time.perf_counter() - start, host=key[1], status=resp.status)
+            metrics.count('http.bytes_received', len(body))
+            metrics.count('http.connections_reused' if reused else 'http.connections_opened')
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return HTTPResponse(resp.status, response_headers, body)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+
+_default_client: HTTPClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> HTTPClient:
+    # shared by every lookup so they all draw on the same connection pool
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
@@ -0,0 +1,167 @@
+import sqlite3
+import typing
+from collections.abc import Iterable
+
+# One row per move away from a call sign by one FRN ('' for none): the call sign moved to, and
+# where that FRN's chain of moves ends. A call sign reissued to someone else can have been left by
+# several FRNs, so chains are followed along the FRN that made each move. ``current`` is
+# precomputed, so resolving an old call sign is one index read however long the chain, and walking
+# a chain is one read per hop.
+LINEAGE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS lineage (
+    call_sign TEXT NOT NULL,
+    successor TEXT NOT NULL,
+    current TEXT NOT NULL,
+    frn TEXT NOT NULL,
+    system_identifier INTEGER NOT NULL,
+    PRIMARY KEY (call_sign, frn)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lineage_by_successor ON lineage (successor, frn, system_identifier);
+'''
+
+# present only in the per-FRN layout; a database without it has lineage to rebuild
+LINEAGE_INDEX = 'lineage_by_successor'
+
+# A license naming a previous call sign is a move from it, provided the previous call sign's own
+# licenses (if any are left) were held under the same FRN; anything else is taken for a data
+# error. A previous call sign that is active again has been reissued, so it is its own current
+# holder and lookups of it are not redirected; chains through it still reach where each FRN went.
+_MOVES = '''
+SELECT n.previous_call_sign, n.call_sign, n.frn, n.system_identifier,
+    EXISTS (SELECT 1 FROM licenses p WHERE p.call_sign = n.previous_call_sign AND p.status = 'A')
+FROM licenses n
+WHERE n.previous_call_sign IS NOT NULL AND n.previous_call_sign NOT IN ('', n.call_sign)
+    AND (
+        NOT EXISTS (SELECT 1 FROM licenses p WHERE p.call_sign = n.previous_call_sign)
+        OR EXISTS (SELECT 1 FROM licenses p WHERE p.call_sign = n.previous_call_sign AND p.frn = n.frn)
+    )
+ORDER BY n.system_identifier
+'''
+
+# SQLite's default limit on bound parameters is 999 before 3.32
+_CHUNK = 500
+
+
+class Move(typing.NamedTuple):
+    successor: str
+    frn: str
+    system_identifier: int
+    reissued: bool
+
+
+def _holder_frn(conn: sqlite3.Connection, call_sign: str) -> str:
+    # the FRN of the call sign's current (else latest) license, or of whoever last moved on from it
+    row = conn.execute(
+        "SELECT frn FROM licenses WHERE call_sign = ? ORDER BY status = 'A' DESC, system_identifier DESC LIMIT 1",
+        (call_sign,),
+    ).fetchone()
+    if row is None:
+        row = conn.execute(
+            'SELECT frn FROM lineage WHERE call_sign = ? ORDER BY system_identifier DESC LIMIT 1', (call_sign,)
+        ).fetchone()
+    return (row and row[0]) or ''
+
+
+def build_lineage(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild the lineage table from the licenses' previous call signs; returns the number of moves
+
+    The caller commits.
+    """
+    moves: dict[tuple[str, str], Move] = {}
+    for previous, call_sign, frn, system_identifier, reissued in conn.execute(_MOVES):
+        # ordered by system identifier, so each FRN's latest license naming a previous call sign wins
+        moves[previous, frn or ''] = Move(call_sign, frn or '', system_identifier, bool(reissued))
+
+    # (call sign, FRN) -> where that FRN's moves from the call sign end
+    ends: dict[tuple[str, str], str] = {}
+    for start in moves:
+        path: list[tuple[str, str]] = []
+        key = start
+        while key not in ends:
+            move = moves.get(key)
+            # a call sign can come back round (e.g. a vanity call given up for the old one)
+            if move is None or key in path:
+                ends[key] = key[0]
+                break
+            path.append(key)
+            key = (move.successor, move.frn)
+        end = ends[key]
+        for key in path:
+            ends[key] = end
+
+    conn.execute('DELETE FROM lineage')
+    conn.executemany(
+        'INSERT INTO lineage VALUES (?, ?, ?, ?, ?)',
+        (
+            (
+                call_sign,
+                move.successor,
+                call_sign if move.reissued else ends[call_sign, frn],
+                frn,
+                move.system_identifier,
+            )
+            for (call_sign, frn), move in moves.items()
+        ),
+    )
+    return len(moves)
+
+
+def current_call_sign(conn: sqlite3.Connection, call_sign: str) -> str:
+    call_sign = call_sign.upper()
+    # the latest move away from a call sign is the one its lookups follow
+    row = conn.execute(
+        'SELECT current FROM lineage WHERE call_sign = ? ORDER BY system_identifier DESC LIMIT 1', (call_sign,)
+    ).fetchone()
+    return call_sign if row is None else row[0]
+
+
+def chain(conn: sqlite3.Connection, call_sign: str) -> list[str]:
+    """
+    The call signs ``call_sign``'s holder has had, oldest first, through to the current one
+    """
+    call_sign = call_sign.upper()
+    # only the holder's own moves count, not those of anyone else who has held one of the call signs
+    frn = _holder_frn(conn, call_sign)
+    earlier: list[str] = []
+    previous = call_sign
+    while True:
+        row = conn.execute(
+            'SELECT call_sign FROM lineage WHERE successor = ? AND frn = ? ORDER BY system_identifier DESC LIMIT 1',
+            (previous, frn),
+        ).fetchone()
+        if row is None or row[0] == call_sign or row[0] in earlier:
+            break
+        previous = row[0]
+        earlier.append(previous)
+    later: list[str] = []
+    following = call_sign
+    while True:
+        row = conn.execute('SELECT successor FROM lineage WHERE call_sign = ? AND frn = ?', (following, frn)).fetchone()
+        if row is None or row[0] == call_sign or row[0] in earlier or row[0] in later:
+            break
+        following = row[0]
+        later.append(following)
+    return [*reversed(earlier), call_sign, *later]
+
+
+def normalize(conn: sqlite3.Connection, call_signs: Iterable[str]) -> dict[str, str]:
+    """
+    Map every call sign to its current holder's call sign (itself when it has not moved on)
+
+    Call signs are resolved a chunk per query rather than one query each.
+    """
+    call_signs = list(dict.fromkeys(call_sign.upper() for call_sign in call_signs))
+    resolved = dict(zip(call_signs, call_signs))
+    for start in range(0, len(call_signs), _CHUNK):
+        stop = start + _CHUNK
+        chunk = call_signs[start:stop]
+        placeholders = ', '.join('?' * len(chunk))
+        resolved.update(
+            # ordered so that each call sign's latest move is the one that stays
+            conn.execute(
+                f'SELECT call_sign, current FROM lineage WHERE call_sign IN ({placeholders}) ORDER BY system_identifier',
+                chunk,
+            )
+        )
+    return resolved
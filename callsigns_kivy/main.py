@@ -1,4 +1,22 @@
-from app import Callsigns
+import pathlib
+import sys
+import types
+
+if __package__:
+    from .profiling import startup
+
+    with startup.phase('imports'):
+        from .app import Callsigns
+else:
+    # buildozer ships the package contents as the app root; register that directory
+    # as the callsigns_kivy package so the modules' relative imports resolve
+    package = types.ModuleType('callsigns_kivy')
+    package.__path__ = [str(pathlib.Path(__file__).parent)]
+    sys.modules['callsigns_kivy'] = package
+    from callsigns_kivy.profiling import startup
+
+    with startup.phase('imports'):
+        from callsigns_kivy.app import Callsigns
 
 if __name__ == '__main__':
     Callsigns().run()
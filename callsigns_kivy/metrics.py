@@ -0,0 +1,144 @@
+import collections
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+# Histogram buckets grow by 2**(1/8) (about 9%), from 10us up; percentiles are reported as
+# the upper bound of the bucket they fall in, so they are never understated by more than that.
+_BUCKET_BASE = 10e-6
+_BUCKETS_PER_DOUBLING = 8
+_BUCKET_COUNT = 8 * 24  # up to ~170s
+
+# individual spans kept for export, newest last
+DEFAULT_MAX_EVENTS = 10_000
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """
+    Log-bucketed latency histogram with constant memory, cheap enough to record on every lookup
+    """
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        if seconds <= _BUCKET_BASE:
+            return 0
+        bucket = math.ceil(math.log2(seconds / _BUCKET_BASE) * _BUCKETS_PER_DOUBLING)
+        return min(bucket, _BUCKET_COUNT - 1)
+
+    @staticmethod
+    def _upper_bound(bucket: int) -> float:
+        return _BUCKET_BASE * 2 ** (bucket / _BUCKETS_PER_DOUBLING)
+
+    def record(self, seconds: float) -> None:
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        summary = {'count': self.count, 'mean_ms': self.total / self.count * 1000 if self.count else 0.0}
+        for p in PERCENTILES:
+            summary[f'p{p}_ms'] = self.percentile(p) * 1000
+        summary['max_ms'] = self.max * 1000
+        return summary
+
+
+class Metrics:
+    """
+    Timing spans, latency histograms and counters for the lookup hot paths
+
+    Spans are recorded from any thread. Every span goes into its name's histogram and into a
+    bounded event log that :meth:`export_jsonl` writes out for offline analysis.
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        self.histograms: dict[str, Histogram] = collections.defaultdict(Histogram)
+        self.counters: collections.Counter[str] = collections.Counter()
+        self.events: collections.deque[dict[str, Any]] = collections.deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, **attrs: Any) -> None:
+        event = {'ts': time.time(), 'span': name, 'ms': seconds * 1000, **attrs}
+        with self._lock:
+            self.histograms[name].record(seconds)
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **attrs)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def hit_ratio(self) -> float | None:
+        # lookups answered without a full download: fresh cache, local database or a 304
+        hits = self.counters['lookup.cache'] + self.counters['lookup.database'] + self.counters['lookup.revalidated']
+        total = hits + self.counters['lookup.network'] + self.counters['lookup.missing']
+        return hits / total if total else None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'spans': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'hit_ratio': self.hit_ratio(),
+            }
+
+    def report(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f'{"span":<22} {"n":>5} {"p50":>8} {"p95":>8} {"p99":>8}']
+        for name, s in snapshot['spans'].items():
+            lines.append(f'{name:<22} {s["count"]:>5} {s["p50_ms"]:>8.1f} {s["p95_ms"]:>8.1f} {s["p99_ms"]:>8.1f}')
+        lines.append('')
+        lines.extend(f'{name}: {value:,}' for name, value in snapshot['counters'].items())
+        if snapshot['hit_ratio'] is not None:
+            lines.append(f'cache hit ratio: {snapshot["hit_ratio"]:.0%}')
+        return '\n'.join(lines)
+
+    def export_jsonl(self, path: str | os.PathLike) -> int:
+        # one line per span, then one summary line; returns the number of spans written
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+            f.write(json.dumps({'ts': time.time(), 'summary': self.snapshot()}) + '\n')
+        return len(events)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.events.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,53 @@
+import contextlib
+import time
+import typing
+from collections.abc import Iterator
+
+# phases reported by the app, in startup order
+STARTUP_PHASES = ('imports', 'build', 'first paint', 'store load', 'history render')
+
+
+class Phase(typing.NamedTuple):
+    name: str
+    start: float  # seconds since the profiler was created
+    duration: float
+
+
+class StartupProfiler:
+    """
+    Records how long each phase of startup takes, measured from when the profiler was created
+
+    The shared :data:`startup` profiler is created when this module is first imported, so
+    importing it before anything else makes the origin as close to process start as Python
+    allows. A phase is either timed with :meth:`phase` or marked as an instant with
+    :meth:`mark` (e.g. the first frame being drawn).
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases: list[Phase] = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            self.phases.append(Phase(name, start, self.elapsed() - start))
+
+    def mark(self, name: str) -> None:
+        self.phases.append(Phase(name, self.elapsed(), 0.0))
+
+    def report(self) -> str:
+        lines = [f'{"phase":<16} {"at ms":>8} {"took ms":>8}']
+        for phase in sorted(self.phases, key=lambda phase: phase.start):
+            lines.append(f'{phase.name:<16} {phase.start * 1000:>8.1f} {phase.duration * 1000:>8.1f}')
+        end = max((phase.start + phase.duration for phase in self.phases), default=0.0)
+        lines.append(f'{"total":<16} {end * 1000:>8.1f}')
+        return '\n'.join(lines)
+
+
+startup = StartupProfiler()
@@ -0,0 +1,118 @@
+import bisect
+import heapq
+import itertools
+import re
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Self
+
+from .fuzzy import DEFAULT_MAX_DISTANCE
+from .fuzzy import FuzzyIndex
+from .fuzzy import Match
+from .uls import LicenseDatabase
+
+# '?' matches one character and '*' any number of characters, e.g. 'KK7L*' or '?B1ABC'
+WILDCARDS = '?*'
+
+DEFAULT_LIMIT = 10
+
+
+def has_wildcards(query: str) -> bool:
+    return any(c in query for c in WILDCARDS)
+
+
+def _compile(query: str) -> re.Pattern[str]:
+    parts = ('[A-Z0-9]' if c == '?' else '[A-Z0-9]*' if c == '*' else re.escape(c) for c in query)
+    return re.compile(''.join(parts))
+
+
+def _literal_prefix(query: str) -> str:
+    return re.split(r'[?*]', query, maxsplit=1)[0]
+
+
+def _literal_suffix(query: str) -> str:
+    return re.split(r'[?*]', query)[-1]
+
+
+class CallSignIndex:
+    """
+    Sorted index of known call signs for prefix and wildcard queries
+
+    Queries are narrowed with bisect to the range sharing the query's literal prefix, or, when
+    the query starts with a wildcard, the range of reversed call signs sharing its literal
+    suffix. Only that range is matched against the pattern; a prefix range is matched only until
+    ``limit`` hits, a suffix range (which is not in call sign order) in full.
+    :meth:`similar` finds call signs a typo or two away through a :class:`~.fuzzy.FuzzyIndex`.
+    """
+
+    def __init__(self, call_signs: Iterable[str] = (), *, presorted: bool = False):
+        keys = list(call_signs) if presorted else sorted(set(call_signs))
+        self._keys = keys
+        self._reversed: list[str] | None = None
+        self._fuzzy: FuzzyIndex | None = None
+
+    @classmethod
+    def from_database(cls, db: LicenseDatabase) -> Self:
+        # the call sign index on the licenses table yields them already sorted
+        return cls(db.call_signs(sort=True), presorted=True)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, call_sign: str) -> bool:
+        i = bisect.bisect_left(self._keys, call_sign)
+        return i < len(self._keys) and self._keys[i] == call_sign
+
+    def add(self, call_sign: str) -> None:
+        if call_sign in self:
+            return
+        bisect.insort(self._keys, call_sign)
+        if self._reversed is not None:
+            bisect.insort(self._reversed, call_sign[::-1])
+        if self._fuzzy is not None:
+            self._fuzzy.add(call_sign)
+
+    def prepare(self) -> None:
+        # build the suffix and typo indexes up front (e.g. off the UI thread) rather than on first use
+        self._reversed_keys()
+        self._fuzzy_index()
+
+    def _reversed_keys(self) -> list[str]:
+        if self._reversed is None:
+            self._reversed = sorted(key[::-1] for key in self._keys)
+        return self._reversed
+
+    def _fuzzy_index(self) -> FuzzyIndex:
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self._keys)
+        return self._fuzzy
+
+    @staticmethod
+    def _range(keys: list[str], prefix: str) -> Iterator[str]:
+        start = bisect.bisect_left(keys, prefix)
+        # every key sharing the prefix sorts before prefix + a character above the alphabet
+        end = bisect.bisect_left(keys, prefix + '\x7f', lo=start)
+        return map(keys.__getitem__, range(start, end))
+
+    def prefix(self, prefix: str, limit: int | None = DEFAULT_LIMIT) -> list[str]:
+        return list(itertools.islice(self._range(self._keys, prefix), limit))
+
+    def search(self, query: str, limit: int | None = DEFAULT_LIMIT) -> list[str]:
+        query = query.upper()
+        if not has_wildcards(query):
+            return self.prefix(query, limit)
+        pattern = _compile(query)
+        prefix = _literal_prefix(query)
+        suffix = _literal_suffix(query)
+        if len(suffix) > len(prefix):
+            candidates: Iterable[str] = (key[::-1] for key in self._range(self._reversed_keys(), suffix[::-1]))
+            matches = filter(pattern.fullmatch, candidates)
+            # reversed order isn't call sign order, so the whole range is matched to find the first ``limit``
+            return sorted(matches) if limit is None else heapq.nsmallest(limit, matches)
+        candidates = self._range(self._keys, prefix) if prefix else iter(self._keys)
+        return list(itertools.islice(filter(pattern.fullmatch, candidates), limit))
+
+    def similar(
+        self, call_sign: str, limit: int | None = DEFAULT_LIMIT, max_distance: int = DEFAULT_MAX_DISTANCE
+    ) -> list[Match]:
+        return self._fuzzy_index().search(call_sign, limit, max_distance)
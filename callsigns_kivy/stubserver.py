@@ -0,0 +1,255 @@
+"""
+Local stand-in for the call sign lookup API and the FCC License View API
+
+    python -m callsigns_kivy.stubserver --generate 1000 --latency 0.05 --error-rate 0.01
+    CALLSIGNS_LOOKUP_BASE_URL=http://127.0.0.1:8080 CALLSIGNS_FCC_BASE_URL=http://127.0.0.1:8080 \\
+        python -m callsigns_kivy lookup K7ABC
+
+Fixtures are a JSON object mapping call signs to their license list, in the lookup API's
+format. Both APIs are served from the same fixtures, with keep-alive, ETags and 304s on the
+lookup API and paged results on the License View API.
+"""
+import argparse
+import email.utils
+import hashlib
+import http.server
+import json
+import os
+import random
+import string
+import threading
+import time
+import urllib.parse
+from collections.abc import Mapping
+from typing import Any
+from typing import Self
+
+from .api import FCC_LICENSE_VIEW_PATH
+from .records import LICENSE_STATUS_CODES
+
+DEFAULT_PORT = 8080
+DEFAULT_ROWS_PER_PAGE = 100
+
+_LOOKUP_PREFIX = '/callsigns/'
+
+# the License View API's answer when nothing matches
+_NO_LICENSES = {'status': 'Info', 'Errors': {'Err': [{'code': '110', 'msg': 'No license data was found.'}]}}
+
+
+def generate_fixtures(n: int, seed: int = 0) -> dict[str, list[dict[str, Any]]]:
+    # plausible, reproducible licenses for n distinct call signs
+    rng = random.Random(seed)
+    letters = string.ascii_uppercase
+    fixtures: dict[str, list[dict[str, Any]]] = {}
+    while len(fixtures) < n:
+        prefix = ''.join(rng.choice(letters) for _ in range(rng.choice((1, 2))))
+        suffix = ''.join(rng.choice(letters) for _ in range(rng.choice((1, 2, 3))))
+        call_sign = f'{prefix}{rng.randrange(10)}{suffix}'
+        fixtures[call_sign] = [
+            {
+                'call_sign': call_sign,
+                'status': rng.choice('AAAAEC'),
+                'frn': f'{rng.randrange(10**10):010d}',
+                'system_identifier': str(rng.randrange(10**7)),
+                'first_name': rng.choice(('John', 'Mary', 'Hiram', 'Ada', 'Grace')),
+                'last_name': rng.choice(('Smith', 'Maxim', 'Lovelace', 'Hopper', 'Nguyen')),
+                'city': 'Springfield',
+                'state': rng.choice(('CT', 'WA', 'TX', 'CA')),
+                'zip_code': f'{rng.randrange(100000):05d}',
+                'grant_date': '04/01/2023',
+                'expired_date': '04/01/2033',
+                'operator_class': rng.choice('TGE'),
+            }
+        ]
+    return fixtures
+
+
+def license_view_entry(record: dict[str, Any]) -> dict[str, str]:
+    # a lookup API record as the License View API describes it
+    name = ', '.join(i for i in (record.get('last_name'), record.get('first_name')) if i)
+    license_id = record.get('system_identifier') or ''
+    return {
+        'licName': name,
+        'frn': record.get('frn') or '',
+        'callsign': record['call_sign'],
+        'categoryDesc': 'Personal Use',
+        'serviceDesc': 'Amateur',
+        'statusDesc': LICENSE_STATUS_CODES.get(record.get('status'), record.get('status') or ''),
+        'expiredDate': record.get('expired_date') or '',
+        'licenseID': license_id,
+        'licDetailURL': f'http://wireless2.fcc.gov/UlsApp/UlsSearch/license.jsp?__newWindow=false&licKey={license_id}',
+    }
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body go out in separate writes; with Nagle on, a reused connection would wait
+    # out the client's delayed ACK (~40ms) before the body is sent
+    disable_nagle_algorithm = True
+    server: 'StubServer'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        delay, fail = self.server.next_request()
+        time.sleep(delay)
+        if fail:
+            self._send(503, b'{"error": "injected failure"}')
+            return
+        url = urllib.parse.urlsplit(self.path)
+        if url.path.startswith(_LOOKUP_PREFIX):
+            self._lookup(urllib.parse.unquote(url.path.removeprefix(_LOOKUP_PREFIX)))
+        elif url.path == FCC_LICENSE_VIEW_PATH:
+            self._license_view(urllib.parse.parse_qs(url.query))
+        else:
+            self._send(404, b'{}')
+
+    def _lookup(self, name: str) -> None:
+        call_sign = name.removesuffix('.json').upper()
+        body = self.server.bodies.get(call_sign)
+        if body is None:
+            self._send(404, b'[]')
+            return
+        etag = self.server.etags[call_sign]
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag)
+            return
+        self._send(200, body, etag)
+
+    def _license_view(self, query: dict[str, list[str]]) -> None:
+        search = query.get('searchValue', [''])[0].upper()
+        page = int(query.get('pageNum', ['1'])[0])
+        rows = int(query.get('rowsPerPage', query.get('rowPerPage', [str(DEFAULT_ROWS_PER_PAGE)]))[0])
+        # like the real API, a search value matches every call sign containing it
+        matches = [call_sign for call_sign in self.server.call_signs if search and search in call_sign]
+        if not matches:
+            self._send(200, json.dumps(_NO_LICENSES).encode())
+            return
+        start, stop = (page - 1) * rows, page * rows
+        selected = matches[start:stop]
+        licenses = {
+            'page': str(page),
+            'rowPerPage': str(rows),
+            'totalRows': str(len(matches)),
+            'lastUpdate': time.strftime('%b %d, %Y'),
+            'License': [license_view_entry(self.server.records[call_sign][-1]) for call_sign in selected],
+        }
+        self._send(200, json.dumps({'status': 'OK', 'Licenses': licenses}).encode())
+
+    def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        if self.server.expires is not None and status in (200, 304):
+            self.send_header('Expires', email.utils.formatdate(time.time() + self.server.expires, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """
+    The stand-in server; use as a context manager to serve from a background thread
+
+    ``latency`` (plus up to ``jitter``) seconds are slept before each response, a fraction
+    ``error_rate`` of requests fail with a 503, and ``expires`` sets the Expires header to
+    that many seconds ahead.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        records: Mapping[str, list[dict[str, Any]]],
+        address: tuple[str, int] = ('127.0.0.1', 0),
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        expires: float | None = None,
+        seed: int | None = None,
+        verbose: bool = False,
+    ):
+        super().__init__(address, _Handler)
+        self.records = {call_sign.upper(): data for call_sign, data in records.items()}
+        self.call_signs = sorted(self.records)
+        self.bodies = {call_sign: json.dumps(data).encode() for call_sign, data in self.records.items()}
+        self.etags = {call_sign: f'"{hashlib.sha1(body).hexdigest()[:16]}"' for call_sign, body in self.bodies.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.expires = expires
+        self.verbose = verbose
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def next_request(self) -> tuple[float, bool]:
+        # (seconds to wait, whether to fail) for the next request, from any handler thread
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = bool(self.error_rate) and self._random.random() < self.error_rate
+        return delay, fail
+
+    def __enter__(self) -> Self:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def load_fixtures(path: str | os.PathLike) -> dict[str, list[dict[str, Any]]]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    fixtures = parser.add_mutually_exclusive_group(required=True)
+    fixtures.add_argument('--fixtures', help='JSON object of call sign -> license list')
+    fixtures.add_argument('--generate', type=int, metavar='N', help='serve N generated call signs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many more seconds, at random')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 503')
+    parser.add_argument('--expires', type=float, help='send Expires this many seconds ahead')
+    parser.add_argument('--dump', help='also write the fixtures to this file, e.g. to feed a load generator')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    records = load_fixtures(args.fixtures) if args.fixtures else generate_fixtures(args.generate)
+    if args.dump:
+        with open(args.dump, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+    server = StubServer(
+        records,
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        expires=args.expires,
+        verbose=args.verbose,
+    )
+    print(f'Serving {len(records):,} call signs at {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
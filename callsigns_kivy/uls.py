@@ -0,0 +1,496 @@
+import argparse
+import csv
+import datetime
+import io
+import os
+import sqlite3
+import threading
+import typing
+import zipfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+from typing import Self
+
+from . import lineage
+from .records import FCC_AM_FIELD_NAMES
+from .records import FCC_EN_FIELD_NAMES
+from .records import FCC_HD_FIELD_NAMES
+from .records import LicenseRecord
+from .stats import LicenseStats
+from .stats import STATS_SCHEMA
+
+# REF: https://www.fcc.gov/uls/transactions/daily-weekly
+#      Amateur weekly dump: https://data.fcc.gov/download/pub/uls/complete/l_amat.zip
+#      Amateur daily transactions: https://data.fcc.gov/download/pub/uls/daily/l_am_{day}.zip
+
+LICENSE_DB_FILE = 'licenses.db'
+
+DAILY_FILE_URL = 'https://data.fcc.gov/download/pub/uls/daily/{name}'
+
+# the FCC only keeps the last week of daily files, one per weekday
+DAILY_RETENTION_DAYS = 7
+
+LAST_APPLIED_KEY = 'last_applied'
+
+# rows buffered per executemany; together with the page cache below this bounds import memory
+DEFAULT_BATCH_SIZE = 5_000
+DEFAULT_CACHE_KIB = 16 * 1024
+
+# LicenseRecord field -> ULS field name, per source file
+HD_COLUMNS = {
+    'call_sign': 'Call Sign',
+    'status': 'License Status',
+    'grant_date': 'Grant Date',
+    'expired_date': 'Expired Date',
+    'cancellation_date': 'Cancellation Date',
+}
+
+AM_COLUMNS = {
+    'operator_class': 'Operator Class',
+    'group_code': 'Group Code',
+    'region_code': 'Region Code',
+    'trustee_call_sign': 'Trustee Call Sign',
+    'trustee_name': 'Trustee Name',
+    'previous_call_sign': 'Previous Call Sign',
+    'vanity': 'Vanity Call Sign Change',
+    'systematic': 'Systematic Call Sign Change',
+}
+
+EN_COLUMNS = {
+    'frn': 'FCC Registration Number (FRN)',
+    'first_name': 'First Name',
+    'middle_initial': 'MI',
+    'last_name': 'Last Name',
+    'street_address': 'Street Address',
+    'attn_line': 'Attention Line',
+    'city': 'City',
+    'state': 'State',
+    'zip_code': 'Zip Code',
+    'po_box': 'PO Box',
+}
+
+# Y/N indicator fields; only a 'Y' is kept so the UI can test them for truthiness
+FLAG_COLUMNS = frozenset({'vanity', 'systematic'})
+
+# Only the licensee entity is kept from EN (contacts, transferors etc. are dropped)
+LICENSEE_ENTITY_TYPE = 'L'
+
+_STAGES = (
+    ('hd', 'HD.dat', FCC_HD_FIELD_NAMES, HD_COLUMNS),
+    ('am', 'AM.dat', FCC_AM_FIELD_NAMES, AM_COLUMNS),
+    ('en', 'EN.dat', FCC_EN_FIELD_NAMES, EN_COLUMNS),
+)
+
+_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS licenses (
+    system_identifier INTEGER PRIMARY KEY,
+    {', '.join(f'{name} TEXT' for name in LicenseRecord._fields if name != 'system_identifier')}
+);
+CREATE INDEX IF NOT EXISTS licenses_call_sign ON licenses (call_sign);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+# Reverse lookup key -> the indexed expression it is an equality probe on. Each index entry also
+# carries the rowid (the system identifier), so a page of matches in system identifier order is
+# a single range read of the index whatever the size of the database.
+REVERSE_INDEXES = {
+    'frn': 'frn',
+    'name': 'last_name COLLATE NOCASE',
+    'zip': 'substr(zip_code, 1, 5)',
+    'trustee': 'trustee_call_sign',
+    'previous': 'previous_call_sign',
+}
+
+DEFAULT_PAGE_SIZE = 50
+
+# created after the bulk insert of a full import, and on opening a database built before them
+_REVERSE_INDEX_SCHEMA = ''.join(
+    f'CREATE INDEX IF NOT EXISTS licenses_by_{key} ON licenses ({expr});\n' for key, expr in REVERSE_INDEXES.items()
+)
+
+_SELECT_COLUMNS = ', '.join(LicenseRecord._fields)
+_USI_POSITION = LicenseRecord._fields.index('system_identifier')
+
+
+def iter_uls_rows(fp: typing.IO[str], field_count: int) -> Iterator[list[str]]:
+    reader = csv.reader(fp, delimiter='|', quoting=csv.QUOTE_NONE)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < field_count:
+            row.extend([''] * (field_count - len(row)))
+        yield row
+
+
+def _open_member(archive: zipfile.ZipFile, name: str) -> typing.IO[str] | None:
+    # member names are upper case in the FCC archives, but be lenient
+    for info in archive.infolist():
+        if info.filename.rsplit('/', 1)[-1].upper() == name.upper():
+            return io.TextIOWrapper(archive.open(info), encoding='latin-1', newline='')
+    return None
+
+
+def _stage_rows(rows: Iterable[list[str]], field_names: list[str], columns: dict[str, str]) -> Iterator[tuple]:
+    usi_index = field_names.index('Unique System Identifier')
+    indexes = [(name, field_names.index(uls_name)) for name, uls_name in columns.items()]
+    entity_index = field_names.index('Entity Type') if field_names is FCC_EN_FIELD_NAMES else None
+    for row in rows:
+        if entity_index is not None and row[entity_index] != LICENSEE_ENTITY_TYPE:
+            continue
+        values: list[str | int | None] = [int(row[usi_index])]
+        for name, index in indexes:
+            value = row[index].strip() or None
+            if name in FLAG_COLUMNS and value != 'Y':
+                value = None
+            values.append(value)
+        yield tuple(values)
+
+
+def _batched(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    batch: list[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_stages(conn: sqlite3.Connection, archive: zipfile.ZipFile, batch_size: int, temp: bool) -> None:
+    for table, member, field_names, columns in _STAGES:
+        conn.execute(
+            f'CREATE {"TEMP " if temp else ""}TABLE {table} '
+            f'(usi INTEGER PRIMARY KEY, {", ".join(f"{name} TEXT" for name in columns)})'
+        )
+        fp = _open_member(archive, member)
+        if fp is None:
+            continue
+        placeholders = ', '.join('?' * (len(columns) + 1))
+        with fp:
+            rows = _stage_rows(iter_uls_rows(fp, len(field_names)), field_names, columns)
+            for batch in _batched(rows, batch_size):
+                # later rows for the same USI supersede earlier ones
+                conn.executemany(f'INSERT OR REPLACE INTO {table} VALUES ({placeholders})', batch)
+
+
+def _joined_select() -> str:
+    exprs = []
+    for name in LicenseRecord._fields:
+        if name == 'system_identifier':
+            exprs.append('hd.usi')
+        elif name in HD_COLUMNS:
+            exprs.append(f'hd.{name}')
+        elif name in AM_COLUMNS:
+            exprs.append(f'am.{name}')
+        else:
+            exprs.append(f'en.{name}')
+    return f'SELECT {", ".join(exprs)} FROM hd LEFT JOIN am USING (usi) LEFT JOIN en USING (usi)'
+
+
+def _merged_select() -> str:
+    # a staged row replaces every column it owns (including clearing it); untouched tables keep the stored values
+    exprs = []
+    for name in LicenseRecord._fields:
+        if name == 'system_identifier':
+            exprs.append('u.usi AS system_identifier')
+            continue
+        table = 'hd' if name in HD_COLUMNS else 'am' if name in AM_COLUMNS else 'en'
+        exprs.append(f'CASE WHEN {table}.usi IS NULL THEN l.{name} ELSE {table}.{name} END AS {name}')
+    return (
+        f'SELECT {", ".join(exprs)} FROM (SELECT usi FROM hd UNION SELECT usi FROM am UNION SELECT usi FROM en) u '
+        'LEFT JOIN hd ON hd.usi = u.usi LEFT JOIN am ON am.usi = u.usi LEFT JOIN en ON en.usi = u.usi '
+        'LEFT JOIN licenses l ON l.system_identifier = u.usi'
+    )
+
+
+def reverse_key_value(key: str, value: str) -> str:
+    # the value as the index holds it: FRNs are zero-padded to 10 digits, ZIP codes are 5 digits
+    if key not in REVERSE_INDEXES:
+        raise ValueError(f'Unknown reverse lookup {key!r}; expected one of {", ".join(REVERSE_INDEXES)}')
+    value = value.strip()
+    if key == 'frn':
+        return value.zfill(10)
+    if key == 'zip':
+        return value[:5]
+    if key in ('trustee', 'previous'):
+        return value.upper()
+    return value
+
+
+def daily_file_name(day: datetime.date) -> str:
+    return f'l_am_{day.strftime("%a").lower()}.zip'
+
+
+def _configure_bulk(conn: sqlite3.Connection, cache_kib: int) -> None:
+    conn.execute(f'PRAGMA cache_size = -{int(cache_kib)}')
+    conn.execute('PRAGMA temp_store = FILE')
+
+
+def import_uls_zip(
+    zip_path: str | os.PathLike,
+    db_path: str | os.PathLike = LICENSE_DB_FILE,
+    *,
+    as_of: datetime.date | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cache_kib: int = DEFAULT_CACHE_KIB,
+) -> int:
+    """
+    Build a fresh license database from a complete ULS amateur dump (l_amat.zip)
+
+    The archive is streamed; rows are staged on disk and joined by SQLite, so memory use
+    is bounded by ``batch_size`` and ``cache_kib`` rather than by the size of the dump.
+    The new database replaces ``db_path`` atomically once complete. Returns the record count.
+
+    ``as_of`` is the date the dump was generated; daily files after it can then be applied
+    with :meth:`LicenseDatabase.catch_up`.
+    """
+    tmp_path = f'{os.fspath(db_path)}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # the file is discarded on failure, so there is nothing for a journal to protect
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        _configure_bulk(conn, cache_kib)
+        with zipfile.ZipFile(zip_path) as archive:
+            _load_stages(conn, archive, batch_size, temp=False)
+        conn.executescript(_SCHEMA)
+        conn.execute(f'INSERT INTO licenses ({_SELECT_COLUMNS}) {_joined_select()}')
+        conn.executescript('DROP TABLE hd; DROP TABLE am; DROP TABLE en;')
+        conn.executescript(_REVERSE_INDEX_SCHEMA)
+        conn.executescript(lineage.LINEAGE_SCHEMA)
+        lineage.build_lineage(conn)
+        if as_of is not None:
+            conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (LAST_APPLIED_KEY, as_of.isoformat()))
+        conn.commit()
+        count = conn.execute('SELECT count(*) FROM licenses').fetchone()[0]
+        conn.execute('VACUUM')
+    except BaseException:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return count
+
+
+class LicenseDatabase:
+    def __init__(self, path: str | os.PathLike = LICENSE_DB_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # the connection is shared between threads; whatever writes holds this, so one thread's commit
+        # never lands inside another's transaction and a second stats build waits for the first
+        self._lock = threading.RLock()
+        self._conn.executescript(_SCHEMA + _REVERSE_INDEX_SCHEMA + STATS_SCHEMA)
+        has_lineage = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (lineage.LINEAGE_INDEX,)
+        )
+        if has_lineage.fetchone() is None:
+            # a database imported before lineage was tracked, or before it was tracked per FRN
+            self._conn.executescript('DROP TABLE IF EXISTS lineage;' + lineage.LINEAGE_SCHEMA)
+            lineage.build_lineage(self._conn)
+            self._conn.commit()
+
+    @classmethod
+    def open_if_exists(cls, path: str | os.PathLike = LICENSE_DB_FILE) -> Self | None:
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def lookup(self, call_sign: str) -> list[LicenseRecord]:
+        # ordered oldest first, like the lookup API, so the current license is last
+        rows = self._conn.execute(
+            f'SELECT {_SELECT_COLUMNS} FROM licenses WHERE call_sign = ? ORDER BY system_identifier',
+            (call_sign.upper(),),
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def get(self, system_identifier: str | int) -> LicenseRecord | None:
+        row = self._conn.execute(
+            f'SELECT {_SELECT_COLUMNS} FROM licenses WHERE system_identifier = ?', (int(system_identifier),)
+        ).fetchone()
+        return None if row is None else self._record(row)
+
+    @staticmethod
+    def _record(row: tuple) -> LicenseRecord:
+        values = list(row)
+        values[_USI_POSITION] = str(values[_USI_POSITION])
+        return LicenseRecord._make(values)
+
+    @property
+    def last_applied(self) -> datetime.date | None:
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (LAST_APPLIED_KEY,)).fetchone()
+        return None if row is None else datetime.date.fromisoformat(row[0])
+
+    def pending_days(self, today: datetime.date | None = None) -> list[datetime.date]:
+        last_applied = self.last_applied
+        if last_applied is None:
+            raise ValueError('Database has no recorded import date; run a full import first')
+        today = today or datetime.date.today()
+        days = [last_applied + datetime.timedelta(days=n) for n in range(1, (today - last_applied).days + 1)]
+        if len(days) > DAILY_RETENTION_DAYS:
+            raise ValueError(f'Database was last updated {last_applied}; daily files are gone, run a full import')
+        return days
+
+    def apply_daily_zip(
+        self,
+        zip_path: str | os.PathLike,
+        day: datetime.date,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """
+        Apply one daily transaction file (l_am_<weekday>.zip) and record ``day`` as applied
+
+        Records are upserted by Unique System Identifier; cancellations arrive as HD rows with
+        an updated status and cancellation date. Returns the number of licenses touched.
+        """
+        with self._lock:
+            last_applied = self.last_applied
+            if last_applied is not None and day <= last_applied:
+                return 0
+            conn = self._conn
+            try:
+                with zipfile.ZipFile(zip_path) as archive:
+                    _load_stages(conn, archive, batch_size, temp=True)
+                cursor = conn.execute(
+                    f'INSERT OR REPLACE INTO licenses ({_SELECT_COLUMNS}) '
+                    f'SELECT * FROM ({_merged_select()}) WHERE call_sign IS NOT NULL'
+                )
+                # a new previous call sign can lengthen or redirect any chain, so rebuild the lot
+                lineage.build_lineage(conn)
+                conn.execute('DELETE FROM stats_columns')
+                conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (LAST_APPLIED_KEY, day.isoformat()))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                for table, *_ in _STAGES:
+                    conn.execute(f'DROP TABLE IF EXISTS temp.{table}')
+            return cursor.rowcount
+
+    def catch_up(self, daily_dir: str | os.PathLike, today: datetime.date | None = None) -> dict[datetime.date, int]:
+        applied = {}
+        for day in self.pending_days(today):
+            name = daily_file_name(day)
+            path = os.path.join(daily_dir, name)
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    f'Missing daily file for {day}: {path} (from {DAILY_FILE_URL.format(name=name)})'
+                )
+            applied[day] = self.apply_daily_zip(path, day)
+        return applied
+
+    def call_signs(self, status: str | None = None, sort: bool = False) -> Iterator[str]:
+        query = 'SELECT DISTINCT call_sign FROM licenses'
+        params: tuple = ()
+        if status is not None:
+            query += ' WHERE status = ?'
+            params = (status,)
+        if sort:
+            query += ' ORDER BY call_sign'
+        for (call_sign,) in self._conn.execute(query, params):
+            yield call_sign
+
+    def find(
+        self, key: str, value: str, *, after: int | None = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> list[LicenseRecord]:
+        """
+        One page of the licenses whose ``key`` (see :data:`REVERSE_INDEXES`) is ``value``
+
+        Pages are in system identifier order; pass the last record's system identifier as
+        ``after`` for the next one.
+        """
+        value = reverse_key_value(key, value)
+        rows = self._conn.execute(
+            f'SELECT {_SELECT_COLUMNS} FROM licenses WHERE {REVERSE_INDEXES[key]} = ? AND system_identifier > ? '
+            'ORDER BY system_identifier LIMIT ?',
+            (value, after or 0, limit),
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def iter_find(self, key: str, value: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[list[LicenseRecord]]:
+        # every page of find(), fetched as the previous one is consumed
+        after = None
+        while page := self.find(key, value, after=after, limit=page_size):
+            yield page
+            if len(page) < page_size:
+                return
+            after = int(page[-1].system_identifier)
+
+    def current_call_sign(self, call_sign: str) -> str:
+        return lineage.current_call_sign(self._conn, call_sign)
+
+    def lineage(self, call_sign: str) -> list[str]:
+        return lineage.chain(self._conn, call_sign)
+
+    def normalize(self, call_signs: Iterable[str]) -> dict[str, str]:
+        return lineage.normalize(self._conn, call_signs)
+
+    def stats(self) -> LicenseStats:
+        # the first call after an import or update reads every license: seconds, not for the UI thread
+        with self._lock:
+            stats = LicenseStats.load(self._conn)
+            if stats is None:
+                stats = LicenseStats.from_connection(self._conn)
+                stats.save(self._conn)
+                self._conn.commit()
+            return stats
+
+    def license_states(self) -> Iterator[tuple[str, str | None, str | None]]:
+        # (call sign, status, date the license ended) for every license
+        yield from self._conn.execute(
+            "SELECT call_sign, status, CASE WHEN status = 'C' THEN cancellation_date ELSE expired_date END "
+            'FROM licenses'
+        )
+
+    def __contains__(self, call_sign: str) -> bool:
+        row = self._conn.execute('SELECT 1 FROM licenses WHERE call_sign = ? LIMIT 1', (call_sign.upper(),))
+        return row.fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT count(*) FROM licenses').fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Build or update the local license database from FCC ULS files')
+    parser.add_argument('--db', default=LICENSE_DB_FILE)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    full = subparsers.add_parser('full', help='rebuild from the complete amateur dump')
+    full.add_argument('zip_path', help='complete amateur dump, e.g. l_amat.zip')
+    full.add_argument('--as-of', type=datetime.date.fromisoformat, help='date the dump was generated (YYYY-MM-DD)')
+    full.add_argument('--cache-kib', type=int, default=DEFAULT_CACHE_KIB)
+    daily = subparsers.add_parser('daily', help='apply daily transaction files')
+    daily.add_argument('daily_dir', help='directory containing the downloaded l_am_<weekday>.zip files')
+    daily.add_argument('--today', type=datetime.date.fromisoformat)
+    args = parser.parse_args(argv)
+    if args.command == 'full':
+        count = import_uls_zip(
+            args.zip_path, args.db, as_of=args.as_of, batch_size=args.batch_size, cache_kib=args.cache_kib
+        )
+        print(f'Imported {count} licenses into {args.db}')
+    else:
+        with LicenseDatabase(args.db) as db:
+            for day, count in db.catch_up(args.daily_dir, args.today).items():
+                print(f'{day}: applied {count} licenses')
+
+
+if __name__ == '__main__':
+    main()
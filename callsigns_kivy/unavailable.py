@@ -0,0 +1,241 @@
+import functools
+import itertools
+import re
+import string
+import typing
+from collections.abc import Sequence
+
+from .records import UNAVAILABLE_PATTERNS
+
+# ARRL rule number for each entry of UNAVAILABLE_PATTERNS. The KP/NP/WP pattern covers rules
+# 9, 10 and 11 (2x3, 2x2 and 2x1), which are told apart by suffix length.
+RULE_NUMBERS: tuple[int | None, ...] = (1, 1, 1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 7, 8, None, 12)
+_KP_RULES = {3: 9, 2: 10, 1: 11}
+
+LETTERS = string.ascii_uppercase
+ALPHABET = frozenset(string.ascii_uppercase + string.digits)
+
+# open-ended repeats are expanded up to this many characters
+MAX_CALL_SIGN_LENGTH = 7
+
+
+class PositionalRule(typing.NamedTuple):
+    # one character set per position; a rule with alternatives or ranged repeats becomes several of these
+    index: int
+    sets: tuple[frozenset[str], ...]
+    anchored_start: bool
+    anchored_end: bool
+
+
+# the repeat that may follow an atom: {m}, {m,}, {m,n}, ?, * or +
+_REPEAT = re.compile(r'\{(\d+)(,(\d*))?\}|[?*+]')
+
+_DIGITS = frozenset(string.digits)
+
+
+class _PatternReader:
+    """
+    Reads the small subset of regex syntax the rules use (literals, \\d, character classes,
+    repeats, groups and alternation) into fixed-length sequences of per-position character sets
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+
+    def _take(self, text: str) -> bool:
+        if self.pattern.startswith(text, self.pos):
+            self.pos += len(text)
+            return True
+        return False
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f'{message} at {self.pos} in {self.pattern!r}')
+
+    def read(self) -> list[tuple[frozenset[str], ...]]:
+        sequences = self._alternation()
+        if self.pos != len(self.pattern):
+            raise self._error('Unsupported pattern element')
+        return sequences
+
+    def _alternation(self) -> list[tuple[frozenset[str], ...]]:
+        sequences = self._sequence()
+        while self._take('|'):
+            sequences += self._sequence()
+        return sequences
+
+    def _sequence(self) -> list[tuple[frozenset[str], ...]]:
+        sequences: list[tuple[frozenset[str], ...]] = [()]
+        while self.pos < len(self.pattern) and self.pattern[self.pos] not in '|)':
+            options = self._repeat(self._atom())
+            sequences = [
+                seq + option
+                for seq in sequences
+                for option in options
+                if len(seq) + len(option) <= MAX_CALL_SIGN_LENGTH
+            ]
+        return sequences
+
+    def _atom(self) -> list[tuple[frozenset[str], ...]]:
+        if self._take('('):
+            # the alternatives in these rules never overlap, so atomicity doesn't change what matches
+            self._take('?:') or self._take('?>')
+            options = self._alternation()
+            if not self._take(')'):
+                raise self._error('Unbalanced group')
+            return options
+        if self._take('['):
+            return [(self._char_class(),)]
+        return [(self._char(),)]
+
+    def _char(self) -> frozenset[str]:
+        if self._take('\\d'):
+            return _DIGITS
+        if self.pos == len(self.pattern) or self.pattern[self.pos] not in ALPHABET:
+            raise self._error('Unsupported pattern element')
+        self.pos += 1
+        return frozenset(self.pattern[self.pos - 1])
+
+    def _char_class(self) -> frozenset[str]:
+        chars: set[str] = set()
+        while not self._take(']'):
+            first = self._char()
+            if self._take('-'):
+                (last,) = self._char()
+                chars.update(map(chr, range(ord(min(first)), ord(last) + 1)))
+            else:
+                chars.update(first)
+        return frozenset(chars) & ALPHABET
+
+    def _repeat(self, unit: list[tuple[frozenset[str], ...]]) -> list[tuple[frozenset[str], ...]]:
+        match = _REPEAT.match(self.pattern, self.pos)
+        if match is None:
+            return unit
+        self.pos = match.end()
+        low_text, open_ended, high_text = match.groups()
+        if low_text is None:
+            low, high = {'?': (0, 1), '*': (0, MAX_CALL_SIGN_LENGTH), '+': (1, MAX_CALL_SIGN_LENGTH)}[match.group()]
+        else:
+            low = int(low_text)
+            high = int(high_text) if high_text else MAX_CALL_SIGN_LENGTH if open_ended else low
+        high = min(high, MAX_CALL_SIGN_LENGTH)
+        return [
+            tuple(itertools.chain.from_iterable(parts))
+            for count in range(low, high + 1)
+            for parts in itertools.product(unit, repeat=count)
+        ]
+
+
+def compile_positional(index: int, pattern: str) -> list[PositionalRule]:
+    anchored_start = pattern.startswith('^')
+    anchored_end = pattern.endswith('$')
+    stop = len(pattern) - anchored_end
+    sets = _PatternReader(pattern[anchored_start:stop]).read()
+    return [PositionalRule(index, option, anchored_start, anchored_end) for option in sets]
+
+
+class UnavailableMatcher:
+    """
+    All UNAVAILABLE_PATTERNS compiled into one matcher
+
+    Single call signs are checked with one alternation of the rules (one named group per rule,
+    so the matching rule is known). For bulk work, :meth:`allowed_mask` resolves the rules
+    against a whole block of call signs sharing a prefix and district at once: each rule is
+    compiled into fixed-length per-position character sets, so the stem either rules out the
+    block, rules out a small product of suffixes, or is not affected at all.
+    """
+
+    def __init__(self, patterns: Sequence[str] = UNAVAILABLE_PATTERNS):
+        self.patterns = list(patterns)
+        self._combined = re.compile('|'.join(f'(?P<r{i}>{pattern})' for i, pattern in enumerate(self.patterns)))
+        self._positional = [rule for i, pattern in enumerate(self.patterns) for rule in compile_positional(i, pattern)]
+        self._masks: dict[tuple[str, int], bytes] = {}
+
+    def match_index(self, call_sign: str) -> int | None:
+        # index into UNAVAILABLE_PATTERNS of the rule that matched, if any
+        match = self._combined.search(call_sign)
+        if match is None:
+            return None
+        return int(match.lastgroup[1:])  # type: ignore[index]
+
+    def match(self, call_sign: str) -> int | None:
+        # ARRL rule number that makes the call sign unavailable, if any
+        index = self.match_index(call_sign)
+        if index is None:
+            return None
+        return rule_number(index, call_sign)
+
+    def __call__(self, call_sign: str) -> bool:
+        return self._combined.search(call_sign) is not None
+
+    def allowed_mask(self, stem: str, suffix_length: int) -> bytes:
+        """
+        One byte per suffix of ``suffix_length`` letters (AA..ZZ order), 1 where stem + suffix is allowed
+        """
+        key = (stem, suffix_length)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = self._build_mask(stem, suffix_length)
+        return mask
+
+    def _build_mask(self, stem: str, suffix_length: int) -> bytes:
+        size = len(LETTERS) ** suffix_length
+        mask = bytearray(b'\x01') * size
+        length = len(stem) + suffix_length
+        for rule in self._positional:
+            width = len(rule.sets)
+            if width > length or (rule.anchored_start and rule.anchored_end and width != length):
+                continue
+            if rule.anchored_start:
+                offsets: Sequence[int] = (0,)
+            elif rule.anchored_end:
+                offsets = (length - width,)
+            else:
+                offsets = range(length - width + 1)
+            for offset in offsets:
+                suffix_sets = self._suffix_sets(rule.sets, offset, stem, suffix_length)
+                if suffix_sets is None:
+                    continue
+                if all(len(s) == len(LETTERS) for s in suffix_sets):
+                    return bytes(size)
+                for suffix in itertools.product(*(sorted(s) for s in suffix_sets)):
+                    mask[_suffix_number(suffix)] = 0
+        return bytes(mask)
+
+    @staticmethod
+    def _suffix_sets(
+        sets: tuple[frozenset[str], ...], offset: int, stem: str, suffix_length: int
+    ) -> list[frozenset[str]] | None:
+        # what each suffix letter must be for the rule to match at ``offset``; None if the stem can't match
+        letters = frozenset(LETTERS)
+        constraints = [letters] * suffix_length
+        for position, chars in enumerate(sets, start=offset):
+            if position < len(stem):
+                if stem[position] not in chars:
+                    return None
+            else:
+                allowed = chars & letters
+                if not allowed:
+                    return None
+                constraints[position - len(stem)] = allowed
+        return constraints
+
+
+def _suffix_number(suffix: Sequence[str]) -> int:
+    number = 0
+    for c in suffix:
+        number = number * 26 + ord(c) - 65
+    return number
+
+
+def rule_number(index: int, call_sign: str) -> int:
+    number = RULE_NUMBERS[index]
+    if number is None:
+        suffix = call_sign[3:]
+        return _KP_RULES.get(len(suffix), 9)
+    return number
+
+
+@functools.cache
+def default_matcher() -> UnavailableMatcher:
+    return UnavailableMatcher()
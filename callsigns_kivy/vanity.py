@@ -0,0 +1,174 @@
+import argparse
+import datetime
+import itertools
+import re
+import string
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Self
+
+from .columns import CallSignColumns
+from .uls import LICENSE_DB_FILE
+from .uls import LicenseDatabase
+from .unavailable import default_matcher
+
+# REF: https://www.fcc.gov/wireless/bureau-divisions/mobility-division/amateur-radio-service/amateur-call-sign-systems
+
+FORMATS = ('1x2', '2x1', '2x2', '1x3', '2x3')
+
+# US amateur prefixes: K, N, W alone, or followed by any letter; AA-AL
+PREFIXES = (
+    *'KNW',
+    *(f'A{c}' for c in 'ABCDEFGHIJKL'),
+    *(f'{first}{c}' for first in 'KNW' for c in string.ascii_uppercase),
+)
+_PREFIX_NUMBERS = {prefix: n for n, prefix in enumerate(PREFIXES)}
+
+# suffixes of each length, in index order (AA, AB, ... ZZ)
+_SUFFIXES = {n: [''.join(p) for p in itertools.product(string.ascii_uppercase, repeat=n)] for n in (1, 2, 3)}
+
+# a call sign becomes available again two years after it expires or is cancelled
+GRACE_PERIOD = datetime.timedelta(days=2 * 365)
+
+_INACTIVE_STATUSES = frozenset({'C', 'E', 'T'})
+
+_CALL_SIGN_PARTS = re.compile(r'([A-Z]{1,2})(\d)([A-Z]{1,3})')
+
+# expand one bitmap byte (bit set = issued) into eight 0/1 bytes (1 = available)
+_EXPAND = [bytes(0 if byte >> bit & 1 else 1 for bit in range(8)) for byte in range(256)]
+
+
+def is_unavailable(call_sign: str) -> bool:
+    return default_matcher()(call_sign)
+
+
+def parse_format(fmt: str) -> tuple[int, int]:
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format {fmt!r}, expected one of {", ".join(FORMATS)}')
+    prefix_length, suffix_length = fmt.split('x')
+    return int(prefix_length), int(suffix_length)
+
+
+class IssuedIndex:
+    """
+    Bitmap of issued call signs, one bit per possible US amateur call sign
+
+    Each (prefix, district) pair owns a byte-aligned block of bits per suffix length, in suffix
+    order, so every candidate under a prefix and district can be checked with one slice.
+    """
+
+    def __init__(self) -> None:
+        self._block_bytes = {n: (26**n + 7) // 8 for n in _SUFFIXES}
+        self._bitmaps = {n: bytearray(size * len(PREFIXES) * 10) for n, size in self._block_bytes.items()}
+        self._count = 0
+
+    def _position(self, call_sign: str) -> tuple[bytearray, int] | None:
+        match = _CALL_SIGN_PARTS.fullmatch(call_sign)
+        if match is None:
+            return None
+        prefix, district, suffix = match.groups()
+        prefix_number = _PREFIX_NUMBERS.get(prefix)
+        if prefix_number is None:
+            return None
+        n = len(suffix)
+        suffix_number = 0
+        for c in suffix:
+            suffix_number = suffix_number * 26 + ord(c) - 65
+        block = prefix_number * 10 + int(district)
+        return self._bitmaps[n], block * self._block_bytes[n] * 8 + suffix_number
+
+    def add(self, call_sign: str) -> None:
+        position = self._position(call_sign)
+        if position is None:
+            return
+        bitmap, bit = position
+        if not bitmap[bit >> 3] >> (bit & 7) & 1:
+            bitmap[bit >> 3] |= 1 << (bit & 7)
+            self._count += 1
+
+    def __contains__(self, call_sign: str) -> bool:
+        position = self._position(call_sign)
+        if position is None:
+            return False
+        bitmap, bit = position
+        return bool(bitmap[bit >> 3] >> (bit & 7) & 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def available_mask(self, prefix: str, district: int, suffix_length: int) -> bytes:
+        # one byte per suffix (1 = not issued), for use with itertools.compress
+        size = self._block_bytes[suffix_length]
+        start = (_PREFIX_NUMBERS[prefix] * 10 + district) * size
+        stop = start + size
+        block = self._bitmaps[suffix_length][start:stop]
+        return b''.join(map(_EXPAND.__getitem__, block))[: 26**suffix_length]
+
+    @classmethod
+    def from_call_signs(cls, call_signs: Iterable[str]) -> Self:
+        index = cls()
+        for call_sign in call_signs:
+            index.add(call_sign)
+        return index
+
+    @classmethod
+    def from_database(cls, db: LicenseDatabase, today: datetime.date | None = None) -> Self:
+        cutoff = (today or datetime.date.today()) - GRACE_PERIOD
+        return cls.from_call_signs(
+            call_sign for call_sign, status, ended in db.license_states() if _still_held(status, ended, cutoff)
+        )
+
+
+def _still_held(status: str | None, ended: str | None, cutoff: datetime.date) -> bool:
+    if status not in _INACTIVE_STATUSES or not ended:
+        return True
+    try:
+        return datetime.datetime.strptime(ended, '%m/%d/%Y').date() > cutoff
+    except ValueError:
+        return True
+
+
+def iter_available(fmt: str, district: int, issued: IssuedIndex) -> Iterator[str]:
+    """
+    Yield available call signs of a format in a call district, as they are found
+    """
+    prefix_length, suffix_length = parse_format(fmt)
+    suffixes = _SUFFIXES[suffix_length]
+    size = len(suffixes)
+    matcher = default_matcher()
+    for prefix in PREFIXES:
+        if len(prefix) != prefix_length:
+            continue
+        stem = f'{prefix}{district}'
+        allowed = matcher.allowed_mask(stem, suffix_length)
+        if not any(allowed):
+            continue
+        available = issued.available_mask(prefix, district, suffix_length)
+        # both masks are 0/1 bytes, so AND-ing them as integers ANDs every candidate at once
+        mask = (int.from_bytes(available) & int.from_bytes(allowed)).to_bytes(size)
+        yield from map(stem.__add__, itertools.compress(suffixes, mask))
+
+
+def search(fmt: str, district: int, issued: IssuedIndex, limit: int | None = None) -> list[str]:
+    """
+    Available call signs ordered by spoken length, then CW length
+    """
+    columns = CallSignColumns(iter_available(fmt, district, issued))
+    return columns.rank(('syllable_length', 'morse_units'), limit=limit)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Find available vanity call signs')
+    parser.add_argument('format', choices=FORMATS)
+    parser.add_argument('district', type=int, choices=range(10))
+    parser.add_argument('--db', default=LICENSE_DB_FILE)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+    with LicenseDatabase(args.db) as db:
+        issued = IssuedIndex.from_database(db)
+    for call_sign in search(args.format, args.district, issued, args.limit):
+        print(call_sign)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import threading
+import time
+import typing
+from typing import Any
+
+from .cache import CacheEntry
+from .cache import LookupCache
+from .cache import parse_expires
+from .metrics import metrics
+
+# how long the first queued write waits for others to share its transaction
+DEFAULT_FLUSH_DELAY = 0.05
+
+# a batch is written without waiting any longer once this many call signs are queued
+DEFAULT_MAX_BATCH = 256
+
+
+class _Put(typing.NamedTuple):
+    data: list[dict[str, Any]]
+    expires: float
+    etag: str | None
+    last_modified: str | None
+
+
+class _Touch(typing.NamedTuple):
+    expires: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+# the queued write for a call sign; None deletes it
+_Write = _Put | _Touch | None
+
+_T = typing.TypeVar('_T', CacheEntry, _Put, _Touch)
+
+
+def _touched(write: _T, touch: _Touch) -> _T:
+    # ``write`` with the touch's expiry, and any validators it carries
+    return write._replace(
+        expires=touch.expires,
+        etag=touch.etag or write.etag,
+        last_modified=touch.last_modified or write.last_modified,
+    )
+
+
+class StoreWriter:
+    """
+    Write-behind front for a :class:`~.cache.LookupCache`
+
+    Writes are queued and return straight away. A background thread commits them in batches,
+    one transaction per batch, with everything queued for a call sign coalesced into a single
+    write: the last put (with the expiry of any later touch) or a delete. Reads see queued
+    writes, so a writer can stand in for the cache wherever the lookup chain takes one.
+    """
+
+    def __init__(
+        self,
+        store: LookupCache,
+        *,
+        flush_delay: float = DEFAULT_FLUSH_DELAY,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self.store = store
+        self.flush_delay = flush_delay
+        self.max_batch = max_batch
+        self._pending: dict[str, _Write] = {}
+        # the batch being committed, still visible to reads until it is
+        self._writing: dict[str, _Write] = {}
+        self._queued = 0
+        self._written = 0
+        self._flushers = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='store-writer', daemon=True)
+        self._thread.start()
+
+    def _writes(self, call_sign: str) -> list[_Write]:
+        # the writes not yet committed for ``call_sign``, newest first
+        with self._condition:
+            return [writes[call_sign] for writes in (self._pending, self._writing) if call_sign in writes]
+
+    def get(self, call_sign: str) -> CacheEntry | None:
+        touches = []
+        for write in self._writes(call_sign):
+            if write is None:
+                return None
+            if isinstance(write, _Put):
+                entry = CacheEntry(call_sign, write.data, write.expires, write.etag, write.last_modified)
+                break
+            touches.append(write)
+        else:
+            entry = self.store.get(call_sign)
+            if entry is None:
+                return None
+        # oldest first, so the newest touch's expiry and validators win
+        for touch in reversed(touches):
+            entry = _touched(entry, touch)
+        return entry
+
+    def put(
+        self,
+        call_sign: str,
+        data: list[dict[str, Any]],
+        expires: str | float | None = None,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        if not isinstance(expires, (int, float)):
+            expires = parse_expires(expires)
+        self._queue(call_sign, _Put(data, expires, etag, last_modified))
+
+    def touch(
+        self,
+        call_sign: str,
+        expires: str | float | None = None,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> bool:
+        # False if there is no entry to touch, as for LookupCache.touch
+        if not isinstance(expires, (int, float)):
+            expires = parse_expires(expires)
+        touch = _Touch(expires, etag, last_modified)
+        writes = self._writes(call_sign)
+        if writes[:1] == [None] or not writes and not self.store.exists(call_sign):
+            return False
+        # merged into the put or touch still queued, so validators it carried are kept
+        self._queue(call_sign, _touched(writes[0], touch) if writes else touch)
+        return True
+
+    def delete(self, call_sign: str) -> None:
+        self._queue(call_sign, None)
+
+    def _queue(self, call_sign: str, write: _Write) -> None:
+        with self._condition:
+            if not self._closed:
+                if call_sign in self._pending:
+                    metrics.count('store.coalesced')
+                self._pending[call_sign] = write
+                self._queued += 1
+                self._condition.notify_all()
+                return
+        # a straggler after close() is written through
+        self._write({call_sign: write})
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until everything queued so far is committed; False if ``timeout`` ran out first
+        """
+        with self._condition:
+            target = self._queued
+            self._flushers += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: self._written >= target, timeout)
+            finally:
+                self._flushers -= 1
+
+    def close(self) -> None:
+        # commits whatever is still queued; later writes go straight to the store
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # give writes arriving close together the chance to share a transaction
+                deadline = time.monotonic() + self.flush_delay
+                while not self._closed and not self._flushers and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._writing, self._pending = self._pending, {}
+                queued = self._queued
+            try:
+                self._write(self._writing)
+            except Exception:
+                # the cache is only a cache: a batch that cannot be written is dropped
+                metrics.count('store.write_error')
+            with self._condition:
+                self._writing = {}
+                self._written = queued
+                self._condition.notify_all()
+
+    def _write(self, writes: dict[str, _Write]) -> None:
+        with metrics.span('store.flush', writes=len(writes)), self.store.transaction():
+            for call_sign, write in writes.items():
+                if write is None:
+                    self.store.delete(call_sign)
+                elif isinstance(write, _Touch):
+                    self.store.touch(call_sign, write.expires, etag=write.etag, last_modified=write.last_modified)
+                else:
+                    self.store.put(
+                        call_sign, write.data, write.expires, etag=write.etag, last_modified=write.last_modified
+                    )
@@ -0,0 +1,54 @@
+from callsigns_kivy import lineage
+from callsigns_kivy.records import LicenseRecord
+from callsigns_kivy.uls import _SELECT_COLUMNS
+from callsigns_kivy.uls import LicenseDatabase
+
+
+def _database(*licenses: tuple[str, str, str, str | None]) -> LicenseDatabase:
+    # (call sign, status, FRN, previous call sign) per license, in system identifier order
+    db = LicenseDatabase(':memory:')
+    placeholders = ', '.join('?' * len(LicenseRecord._fields))
+    for system_identifier, (call_sign, status, frn, previous) in enumerate(licenses, start=1):
+        record = dict.fromkeys(LicenseRecord._fields)
+        record.update(
+            call_sign=call_sign,
+            status=status,
+            frn=frn,
+            system_identifier=system_identifier,
+            previous_call_sign=previous,
+        )
+        db._conn.execute(f'INSERT INTO licenses ({_SELECT_COLUMNS}) VALUES ({placeholders})', tuple(record.values()))
+    lineage.build_lineage(db._conn)
+    return db
+
+
+def test_chain_through_a_reissued_call_sign():
+    # FRN 1 went KD7AAA -> K7XY -> W7Q; K7XY was later reissued to FRN 2
+    db = _database(
+        ('KD7AAA', 'C', '1', None),
+        ('K7XY', 'C', '1', 'KD7AAA'),
+        ('W7Q', 'A', '1', 'K7XY'),
+        ('K7XY', 'A', '2', None),
+    )
+    assert db.current_call_sign('KD7AAA') == 'W7Q'
+    assert db.current_call_sign('K7XY') == 'K7XY'
+    assert db.normalize(['KD7AAA', 'K7XY', 'W7Q']) == {'KD7AAA': 'W7Q', 'K7XY': 'K7XY', 'W7Q': 'W7Q'}
+    assert db.lineage('W7Q') == ['KD7AAA', 'K7XY', 'W7Q']
+    assert db.lineage('KD7AAA') == ['KD7AAA', 'K7XY', 'W7Q']
+    # the new holder gets none of FRN 1's history
+    assert db.lineage('K7XY') == ['K7XY']
+
+
+def test_reissued_call_sign_left_again_by_its_new_holder():
+    # FRN 2 took over K7XY after FRN 1 and moved on to N7Z; FRN 1's chain still ends at W7Q
+    db = _database(
+        ('KD7AAA', 'C', '1', None),
+        ('K7XY', 'C', '1', 'KD7AAA'),
+        ('W7Q', 'A', '1', 'K7XY'),
+        ('K7XY', 'C', '2', None),
+        ('N7Z', 'A', '2', 'K7XY'),
+    )
+    assert db.current_call_sign('KD7AAA') == 'W7Q'
+    assert db.current_call_sign('K7XY') == 'N7Z'
+    assert db.lineage('W7Q') == ['KD7AAA', 'K7XY', 'W7Q']
+    assert db.lineage('N7Z') == ['K7XY', 'N7Z']
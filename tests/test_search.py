@@ -0,0 +1,27 @@
+import fnmatch
+
+import pytest
+
+from benchmarks.harness import sample_call_signs
+from callsigns_kivy.search import CallSignIndex
+
+CALL_SIGNS = sample_call_signs(20_000)
+
+# literal prefix longer (prefix range) or literal suffix longer (reversed suffix range)
+QUERIES = ['W1*', 'K?7A*', 'AB*', 'N?1?', '*AB', '*7ABC', '?B1*Z', '*Q', '*1*', '*AB*X']
+
+
+@pytest.fixture(scope='module')
+def index() -> CallSignIndex:
+    return CallSignIndex(CALL_SIGNS)
+
+
+def _brute_force(query: str) -> list[str]:
+    # the wildcards only stand in for call sign characters, which fnmatch's never need to exclude
+    return sorted(call_sign for call_sign in CALL_SIGNS if fnmatch.fnmatchcase(call_sign, query))
+
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('limit', [1, 10, None])
+def test_search_matches_brute_force(index: CallSignIndex, query: str, limit: int | None):
+    assert index.search(query, limit) == _brute_force(query)[:limit]